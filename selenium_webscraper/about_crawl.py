@@ -0,0 +1,56 @@
+from collections import deque
+from typing import List, Optional, Tuple
+
+from config import MIN_CONTENT_LENGTH, GOOD_SCRAPE_THRESHOLD
+from detect_poor_scrape import calculate_scrape_score
+from scrape_events import Event, ScrapeLog
+
+
+class AboutCrawl:
+    # Candidate about pages for one business, best-ranked first. Pages are offered as
+    # they are fetched; the crawl is done once one scores at the good-scrape threshold.
+    def __init__(self, candidates: List[str], debug_log: ScrapeLog):
+        self.candidates = list(candidates)
+        self.total = len(candidates)
+        self.debug_log = debug_log
+        self._pending = deque(candidates)
+        self.best_url: Optional[str] = None
+        self.best_content = ""
+        self.best_score: Optional[float] = None
+        self.loaded = 0
+        self.failure_status: Optional[str] = None
+        self.done = False
+
+    def next_candidate(self) -> Optional[str]:
+        if self.done or not self._pending:
+            return None
+        return self._pending.popleft()
+
+    @property
+    def position(self) -> int:
+        return self.total - len(self._pending)
+
+    def offer(self, url: str, content: str) -> bool:
+        self.loaded += 1
+        score = calculate_scrape_score({'combined_text': content, 'web_url': url})
+        usable = len(content) >= MIN_CONTENT_LENGTH
+        self.debug_log.event(Event.CANDIDATE_SCORED, url=url, score=round(score, 2), chars=len(content))
+        if usable and (self.best_score is None or score > self.best_score):
+            self.best_url, self.best_content, self.best_score = url, content, score
+        elif self.best_score is None and len(content) >= len(self.best_content):
+            self.best_url, self.best_content = url, content
+        if usable and score >= GOOD_SCRAPE_THRESHOLD:
+            self.debug_log.event(Event.CANDIDATE_ACCEPTED, url=url, skipped=len(self._pending))
+            self.done = True
+        return self.done
+
+    def fail(self, status: str):
+        if self.failure_status is None:
+            self.failure_status = status
+
+    def outcome(self, short_status: str) -> Tuple[str, Optional[str], str]:
+        if self.best_score is not None:
+            return "success_followed_link", self.best_url, self.best_content
+        if self.loaded or self.failure_status is None:
+            return short_status, self.best_url, self.best_content
+        return self.failure_status, self.best_url, self.best_content
@@ -0,0 +1,86 @@
+from typing import Optional, List, Tuple
+from urllib.parse import urlparse, urlunparse
+
+from config import ABOUT_URL_KEYWORDS, ABOUT_LINK_TEXT_PATTERNS, IRRELEVANT_KEYWORDS, MAX_ABOUT_PATHS
+from scrape_events import Event, ScrapeLog
+
+IRRELEVANT_SEGMENTS = set(IRRELEVANT_KEYWORDS)
+
+
+def clean_url(url: str) -> str:
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    parsed_url = urlparse(url)
+    if not parsed_url.netloc:
+        return ""
+    return urlunparse(parsed_url._replace(fragment='', query=''))
+
+
+def normalize_url(url: str, debug_log: ScrapeLog) -> str:
+    cleaned_url = clean_url(url)
+    if cleaned_url:
+        debug_log.event(Event.URL_NORMALIZED, url=url, normalized=cleaned_url)
+    else:
+        debug_log.event(Event.URL_INVALID, url=url)
+    return cleaned_url
+
+
+def _about_link_score(href: str, link_text: str, is_internal: bool) -> Optional[float]:
+    text_index = next((i for i, pattern in enumerate(ABOUT_LINK_TEXT_PATTERNS) if pattern.search(link_text)), None)
+    # Only the path counts: a hostname like aboutface.com would make every internal link a candidate.
+    lowered_path = urlparse(href).path.lower()
+    url_index = next((i for i, kw in enumerate(ABOUT_URL_KEYWORDS) if kw in lowered_path), None)
+    if text_index is None and url_index is None:
+        return None
+
+    # Both lists run from the most to the least specific wording, so earlier hits rank higher.
+    score = 0.0
+    if text_index is not None:
+        score += 2 * (1 - text_index / len(ABOUT_LINK_TEXT_PATTERNS))
+    if url_index is not None:
+        score += 1 - url_index / len(ABOUT_URL_KEYWORDS)
+    if is_internal:
+        score += 3
+    score -= 0.1 * len([segment for segment in urlparse(href).path.split('/') if segment])
+    return score
+
+
+def rank_about_links(anchors: List[Tuple[str, str]], initial_url: str) -> List[str]:
+    # anchors are (absolute href, link text) pairs in document order, however they were harvested.
+    initial_netloc = urlparse(initial_url).netloc
+    initial_clean = clean_url(initial_url)
+    best_scores = {}
+    first_seen = {}
+
+    for position, (href, link_text) in enumerate(anchors):
+        if not href or not href.lower().startswith(('http://', 'https://')):
+            continue
+        cleaned_href = clean_url(href)
+        if not cleaned_href or cleaned_href == initial_clean:
+            continue
+
+        path_segments = urlparse(cleaned_href).path.lower().split('/')
+        if any(segment in IRRELEVANT_SEGMENTS for segment in path_segments):
+            continue
+
+        is_internal = urlparse(cleaned_href).netloc == initial_netloc
+        score = _about_link_score(cleaned_href, (link_text or '').strip(), is_internal)
+        if score is None:
+            continue
+        first_seen.setdefault(cleaned_href, position)
+        best_scores[cleaned_href] = max(score, best_scores.get(cleaned_href, score))
+
+    return sorted(best_scores, key=lambda url: (-best_scores[url], first_seen[url]))
+
+
+def select_about_candidates(anchors: List[Tuple[str, str]], initial_url: str, current_url: str,
+                            debug_log: ScrapeLog, limit: int = MAX_ABOUT_PATHS) -> List[str]:
+    current_clean = clean_url(current_url)
+    candidates = [url for url in rank_about_links(anchors, initial_url) if url != current_clean]
+    if not candidates:
+        debug_log.event(Event.NO_ABOUT_LINK, links=len(anchors))
+        return []
+    selected = candidates[:limit]
+    debug_log.event(Event.CANDIDATES_SELECTED, selected=len(selected), ranked=len(candidates), links=len(anchors), best=selected[0])
+    return selected
@@ -7,7 +7,7 @@ from load_data import load_businesses
 def analyze_businesses():
     print("\n=== ANALYZING BUSINESS DATA ===")
     
-    businesses = load_businesses()
+    businesses = load_businesses(fields=['_id', 'company_name', 'web_url', 'combined_text', 'naics_1_title'])
     total = len(businesses)
     print(f"Total businesses: {total}")
     
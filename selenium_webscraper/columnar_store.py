@@ -0,0 +1,121 @@
+import json
+import sys
+from pathlib import Path
+from typing import Optional, Iterable, Iterator, List, Dict, Any
+
+from config import DATA_PATH, COLUMNAR_DATA_PATH, COLUMNAR_BATCH_SIZE
+from load_data import Business, BUSINESS_FIELDS, iter_records
+
+try:
+    import pyarrow as pa
+except ImportError:
+    print("pyarrow not found, columnar dataset support disabled. Please install it: pip install pyarrow", file=sys.stderr)
+    pa = None
+
+TEXT_FIELDS = {'raw_text', 'about_text', 'combined_text'}
+# Field metadata marking a column whose values are stored as JSON text.
+JSON_ENCODING = {b'encoding': b'json'}
+
+
+def _value_type(value):
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    if isinstance(value, str):
+        return pa.string()
+    return None
+
+
+def business_schema(records: Iterable[Dict[str, Any]]):
+    # Each column takes the one type its values actually have. Columns mixing types or
+    # holding lists and dicts are stored as JSON text, so every value reads back unchanged.
+    seen = {name: set() for name in BUSINESS_FIELDS}
+    for record in records:
+        for name in BUSINESS_FIELDS:
+            value = record.get(name)
+            if value is not None:
+                seen[name].add(_value_type(value))
+
+    columns = []
+    for name in BUSINESS_FIELDS:
+        types = seen[name]
+        if len(types) > 1 or None in types:
+            columns.append(pa.field(name, pa.large_string(), metadata=JSON_ENCODING))
+            continue
+        value_type = types.pop() if types else pa.string()
+        if value_type == pa.string() and name in TEXT_FIELDS:
+            value_type = pa.large_string()
+        columns.append(pa.field(name, value_type))
+    return pa.schema(columns)
+
+
+def _json_columns(schema) -> List[str]:
+    return [field.name for field in schema if field.metadata == JSON_ENCODING]
+
+
+def _record_batch(rows: List[dict], schema):
+    json_columns = set(_json_columns(schema))
+    arrays = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if field.name in json_columns:
+            values = [json.dumps(value) if value is not None else None for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def convert_to_arrow(src: Path = DATA_PATH, dst: Path = COLUMNAR_DATA_PATH, batch_size: int = COLUMNAR_BATCH_SIZE) -> int:
+    # Uncompressed Arrow IPC so the file can be memory-mapped and columns read without decoding.
+    # The source is read twice: once to find each column's type, once to write it.
+    schema = business_schema(iter_records(src))
+    tmp_dst = Path(dst).with_suffix(Path(dst).suffix + ".tmp")
+    total = 0
+    with pa.OSFile(str(tmp_dst), 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        rows = []
+        for record in iter_records(src):
+            rows.append(record)
+            if len(rows) >= batch_size:
+                writer.write_batch(_record_batch(rows, schema))
+                total += len(rows)
+                rows = []
+        if rows:
+            writer.write_batch(_record_batch(rows, schema))
+            total += len(rows)
+    tmp_dst.replace(dst)
+    return total
+
+
+def read_columns(path: Path = COLUMNAR_DATA_PATH, fields: Optional[Iterable[str]] = None):
+    # JSON-encoded columns are returned as stored; iter_records_arrow decodes them.
+    columns = list(fields) if fields is not None else BUSINESS_FIELDS
+    with pa.memory_map(str(path), 'r') as source:
+        return pa.ipc.open_file(source).read_all().select(columns)
+
+
+def iter_records_arrow(path: Path = COLUMNAR_DATA_PATH, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    columns = [name for name in BUSINESS_FIELDS if fields is None or name in set(fields)]
+    with pa.memory_map(str(path), 'r') as source:
+        reader = pa.ipc.open_file(source)
+        json_columns = [name for name in _json_columns(reader.schema) if name in columns]
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(columns)
+            for row in batch.to_pylist():
+                for name in json_columns:
+                    if row[name] is not None:
+                        row[name] = json.loads(row[name])
+                yield row
+
+
+def iter_businesses_arrow(path: Path = COLUMNAR_DATA_PATH, fields: Optional[Iterable[str]] = None) -> Iterator[Business]:
+    for row in iter_records_arrow(path, fields):
+        yield Business(**{name: row.get(name) for name in BUSINESS_FIELDS})
+
+
+if __name__ == "__main__":
+    source_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_PATH
+    target_path = Path(sys.argv[2]) if len(sys.argv) > 2 else source_path.with_suffix('.arrow')
+    count = convert_to_arrow(source_path, target_path)
+    print(f"Converted {count} businesses from {source_path.name} to {target_path.name}")
@@ -1,11 +1,21 @@
+import os
 from pathlib import Path
 import re
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_PATH = BASE_DIR / "scraping_data_enrichment" / "data" / "about_crawl_integrated_20250526_035335.json"
+COLUMNAR_DATA_PATH = DATA_PATH.with_suffix(".arrow")
+COLUMNAR_BATCH_SIZE = 10000
 
+# Scrapes ending in a retryable status (RETRYABLE_STATUS_PREFIXES) are queued again
+# up to MAX_RETRIES times, INITIAL_RETRY_DELAY seconds doubling per attempt (with
+# jitter), behind fresh work. A site (registrable domain) failing this many times in
+# a row, across all its hosts, is left alone for the cooldown. Keep the threshold
+# below 1 + MAX_RETRIES so a failing site cannot use up every attempt of a business.
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 1
+HOST_CIRCUIT_BREAKER_THRESHOLD = 3
+HOST_CIRCUIT_BREAKER_COOLDOWN_SECONDS = 600
 
 PHRASES = [
     "about us", "who we are", "our mission", "our vision", "our values", "company profile",
@@ -30,12 +40,109 @@ KEYWORDS = [
 ]
 
 SELENIUM_TIMEOUT = 15
-PAGE_LOAD_TIMEOUT = 20
-IMPLICIT_WAIT = 10
-PROCESS_TIMEOUT_SECONDS = 300
+IMPLICIT_WAIT = 0
+
+# Each browser scrape gets one deadline, split across its stages. A stage's timeout
+# is its observed p95 latency times the multiplier, clamped to (min, max) seconds;
+# the max applies until enough samples exist. Workers still busy this long after
+# the budget are killed.
+SCRAPE_BUDGET_SECONDS = 60
+STAGE_TIMEOUT_BOUNDS = {
+    "initial_load": (6, 25),
+    "extract": (1, 5),
+    "link_discovery": (1, 5),
+    "follow_load": (6, 20),
+}
+STAGE_TIMEOUT_P95_MULTIPLIER = 1.5
+STAGE_LATENCY_WINDOW = 500
+STAGE_LATENCY_MIN_SAMPLES = 30
+WORKER_KILL_GRACE_SECONDS = 5
+# A new worker starts its browser before it takes jobs; one that is not ready
+# within this time is replaced.
+WORKER_STARTUP_TIMEOUT_SECONDS = 60
+# Scraped text at least this large is handed from a one-off scrape process to its
+# parent through shared memory instead of being pickled over the result pipe.
+SHARED_TEXT_MIN_BYTES = 64 * 1024
+
+# "normal" loads every asset; "lean" uses the eager load strategy, waits only for
+# readable text and blocks images, fonts, media and ad/analytics requests.
+SCRAPE_PROFILE = "normal"
+# Per-scrape request/byte counts from Chrome's performance log. They cost a log
+# transfer on every scrape, so they are off unless a run is benchmarking profiles
+# (--page-load-stats). Not collected in tabbed mode.
+PAGE_LOAD_STATS = False
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.mov", "*.m3u8",
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*hs-analytics.net*",
+    "*hs-scripts.com*", "*segment.io*", "*segment.com/analytics*", "*mixpanel.com*", "*newrelic.com*",
+    "*nr-data.net*", "*clarity.ms*", "*adsrvr.org*", "*criteo.com*", "*taboola.com*", "*outbrain.com*",
+    "*youtube.com/embed*", "*player.vimeo.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*use.typekit.net*"
+]
+
+SCRAPER_POOL_SIZE = 4
+MAX_JOBS_PER_WORKER = 200
+MAX_WORKER_RSS_MB = 1500
+# Concurrent scrapes per worker browser, each in its own tab. With more than one
+# tab, pages load with the 'none' strategy and readiness is polled per tab.
+TABS_PER_WORKER = 1
+TAB_POLL_INTERVAL_SECONDS = 0.1
+TAB_SCRIPT_TIMEOUT_SECONDS = 10
+# Tabs share one cookie jar. It is cleared whenever the browser goes idle, and after
+# this many finished tab jobs even while other tabs are busy, since under steady load
+# the browser is rarely idle.
+TAB_COOKIE_CLEAR_JOBS = 10
 
 MIN_CONTENT_LENGTH = 50
 
+# Before scraping, every candidate domain is resolved; ones that do not exist or
+# resolve to a parking service are skipped and remembered until the TTL runs out.
+DNS_PREFILTER_ENABLED = True
+DNS_PREFILTER_CONCURRENCY = 64
+DNS_TIMEOUT_SECONDS = 5
+DNS_CANARY_DOMAIN = "example.com"
+DEAD_DOMAIN_INDEX_PATH = Path("dead_domains.json")
+DEAD_DOMAIN_TTL_SECONDS = 14 * 24 * 3600
+PARKED_DOMAIN_MARKERS = [
+    "parkingcrew.net", "sedoparking.com", "bodis.com", "parklogic.com", "above.com", "dan.com",
+    "afternic.com", "hugedomains.com", "namebrightdns.com", "undeveloped.com"
+]
+
+RESULTS_JOURNAL_PATH = Path("full_business_scrape_results.journal.jsonl")
+# Scrape debug info is stored as compact event records. "detail" keeps every event,
+# "info" drops per-step chatter and "warning" keeps only problems. With a sidecar
+# path set, every event is also written as text to a size-rotated log.
+DEBUG_LOG_VERBOSITY = "info"
+DEBUG_SIDECAR_MAX_BYTES = 50 * 1024 * 1024
+DEBUG_SIDECAR_BACKUP_COUNT = 5
+# Per-business stage timings ("spans"), one JSON line per scrape.
+SPAN_LOG_PATH = Path("full_business_scrape_results.spans.jsonl")
+
+# Last scrape outcome per business, used by --incremental to queue only new records,
+# records older than the TTL and records whose last attempt failed transiently.
+SCRAPE_STATE_PATH = Path("scrape_state.sqlite3")
+INCREMENTAL_TTL_SECONDS = 30 * 24 * 3600
+RETRYABLE_STATUS_PREFIXES = [
+    "failed_timeout", "failed_process_timeout", "failed_webdriver_error", "failed_webdriver_followed_link",
+    "failed_no_result_from_process", "failed_general_exception", "failed_exception_followed_link",
+    "failed_unknown", "error_main_pipeline", "skipped_host_circuit_open"
+]
+# Browser errors a retry will not fix (no such domain, bad certificate, nothing
+# listening). A failure whose error contains one of these is final; timeouts,
+# resets and other errors are retried.
+PERMANENT_ERROR_MARKERS = [
+    "ERR_NAME_NOT_RESOLVED", "DNS_PROBE_FINISHED_NXDOMAIN", "ERR_CERT_", "ERR_CONNECTION_REFUSED"
+]
+
+# On-disk cache of fetched HTML and browser-rendered text, keyed by normalized URL.
+# Stale entries are revalidated with ETag/Last-Modified instead of refetched blind.
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_DIR = Path("page_cache")
+PAGE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+PAGE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
 ABOUT_SECTION_SELECTORS = [
     "section.about",
     "div#about",
@@ -95,8 +202,25 @@ NAV_SELECTORS = [
     "div.menu",
     "div[role='navigation']"
 ]
+# Content that is not shown to readers (cookie banners, collapsed menus, modal
+# templates) is dropped before text is extracted. The browser also drops elements
+# whose computed style is display:none or visibility:hidden.
+HIDDEN_SELECTORS = ["[hidden]", "[aria-hidden='true']"]
 
 MAX_ABOUT_PATHS = 10
+# Over HTTP, the follow-up fetches one business sends to its own host (known-path
+# probe, then about candidates) share one cap: at most this many at once, with starts
+# spaced this far apart. The browser tries candidates one after another.
+HTTP_HOST_CONCURRENCY = 2
+HTTP_HOST_SPACING_SECONDS = 0.5
+
+# Well-known about paths tried over HTTP when a homepage is thin, before its links
+# are ranked. Paths that hit most often in this run are tried first; the remaining
+# slots go to the least-probed paths, so every path is tried and can earn a rank.
+PROBE_EXTRA_PATHS = ["/about-us", "/aboutus", "/about-us.html", "/about.html", "/company", "/our-company"]
+PROBE_MAX_PATHS = 6
+PROBE_EXPLORE_SLOTS = 2
+MAX_HARVESTED_LINKS = 2000
 
 IRRELEVANT_KEYWORDS = [
     "careers", "jobs", "news", "blog", "investors", "press", "media", "contact", "support",
@@ -107,6 +231,10 @@ IRRELEVANT_KEYWORDS = [
     "case study", "testimonials", "feedback"
 ]
 
+# Adjusted threshold - this should be higher to reduce false positives
+GOOD_SCRAPE_THRESHOLD = 2.0  # Increased from 0.5
+FEATURE_MATRIX_CACHE_PATH = Path("scrape_feature_matrix.npz")
+
 CLASSIFICATION_WEIGHTS = {
     "min_content_length_met": 1.5, 
     "has_about_section": 1.5,      
@@ -117,10 +245,29 @@ CLASSIFICATION_WEIGHTS = {
     "url_contains_about": 0.7     
 }
 
+SCORE_SIGNAL_CACHE_SIZE = 200000
+SCORING_WORKERS = os.cpu_count() or 1
+SCORING_CHUNKSIZE = 500
+
 REQUEST_HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9'
 }
 
-BATCH_SIZE = 50
-REQUEST_DELAY_SECONDS = 5
-BATCH_DELAY_SECONDS = 60
\ No newline at end of file
+HTTP_TIMEOUT_SECONDS = 10
+HTTP_POOL_MAXSIZE = 32
+HTTP_MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+HTTP_CRAWL_THREADS = 16
+
+JS_SHELL_MARKERS = [
+    re.compile(r"<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.IGNORECASE),
+    re.compile(r"<noscript>[^<]*(enable|requires?)\s+javascript", re.IGNORECASE),
+    re.compile(r"\bng-app\b|window\.__INITIAL_STATE__", re.IGNORECASE),
+]
+JS_SHELL_MAX_TEXT_LENGTH = 300
+
+MAX_CONCURRENT_SCRAPES = 8
+PER_HOST_MAX_CONCURRENCY = 1
+PER_HOST_DELAY_SECONDS = 5
+THROUGHPUT_REPORT_INTERVAL_SECONDS = 30
\ No newline at end of file
@@ -1,5 +1,10 @@
 import asyncio
-import re
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
 from config import (
     PHRASES,
     KEYWORDS,
@@ -8,72 +13,131 @@ from config import (
     MIN_CONTENT_LENGTH,
     ABOUT_SECTION_SELECTORS,
     ABOUT_HEADER_PATTERNS,
-    ABOUT_URL_KEYWORDS
+    ABOUT_URL_KEYWORDS,
+    SCORE_SIGNAL_CACHE_SIZE,
+    SCORING_WORKERS,
+    SCORING_CHUNKSIZE,
+    GOOD_SCRAPE_THRESHOLD
 )
-from html_detection import has_about_section, has_about_link
+from html_detection import detect_about_markup
+from pattern_matcher import MultiPatternMatcher
 from urllib.parse import urlparse
 
-IRRELEVANT_PATTERNS = [re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE) for kw in IRRELEVANT_KEYWORDS]
-ABOUT_URL_PATTERNS = [re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE) for kw in ABOUT_URL_KEYWORDS]
+SCORING_FIELDS = ('combined_text', 'about_text', 'raw_text', 'web_url')
 
+TEXT_MATCHER = MultiPatternMatcher({
+    "phrase": (PHRASES, False),
+    "keyword": (KEYWORDS, False),
+    "irrelevant": (IRRELEVANT_KEYWORDS, True),
+})
+URL_MATCHER = MultiPatternMatcher({
+    "about_url": (ABOUT_URL_KEYWORDS, True),
+})
 
-def calculate_scrape_score(business_data: dict) -> float:
+
+_signal_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+# Scrape tiers score candidate pages from worker threads.
+_signal_cache_lock = threading.Lock()
+
+
+def _scoring_inputs(business_data: dict) -> Tuple[str, str]:
     text = (business_data.get('combined_text') or business_data.get('about_text') or business_data.get('raw_text') or '').strip().lower()
-    web_url = business_data.get('web_url', '').lower()
-    score = 0.0
+    web_url = (business_data.get('web_url') or '').lower()
+    return text, web_url
+
+
+def _compute_signals(text: str, web_url: str) -> Dict[str, Any]:
+    # Markup is parsed at most once, and not at all for plain scraped text.
+    has_section, has_link = detect_about_markup(text)
+    # One scan each over text and URL finds every vocabulary hit; the *_count
+    # entries are extra features, the booleans are what the weights apply to.
+    text_counts = TEXT_MATCHER.count(text)
+    url_counts = URL_MATCHER.count(web_url)
+    return {
+        "min_content_length_met": len(text) >= MIN_CONTENT_LENGTH,
+        "has_about_section": has_section,
+        "has_about_link": has_link,
+        "phrase_match": text_counts["phrase"] > 0,
+        "keyword_match": text_counts["keyword"] > 0,
+        "irrelevant_keyword_penalty": text_counts["irrelevant"] > 0,
+        "url_contains_about": url_counts["about_url"] > 0,
+        "phrase_count": text_counts["phrase"],
+        "keyword_count": text_counts["keyword"],
+        "irrelevant_count": text_counts["irrelevant"],
+        "about_url_count": url_counts["about_url"],
+    }
+
+
+def extract_scrape_signals(business_data: dict) -> Dict[str, Any]:
+    text, web_url = _scoring_inputs(business_data)
+    # Keyed by digest so the cache never pins copies of large page texts in memory.
+    key = hashlib.blake2b(f"{web_url}\x00{text}".encode('utf-8'), digest_size=16).digest()
+    with _signal_cache_lock:
+        signals = _signal_cache.get(key)
+        if signals is not None:
+            _signal_cache.move_to_end(key)
+            return signals
+
+    signals = _compute_signals(text, web_url)
+    with _signal_cache_lock:
+        _signal_cache[key] = signals
+        if len(_signal_cache) > SCORE_SIGNAL_CACHE_SIZE:
+            _signal_cache.popitem(last=False)
+    return signals
 
-    # Check minimum content length
-    if len(text) >= MIN_CONTENT_LENGTH:
-        score += CLASSIFICATION_WEIGHTS.get("min_content_length_met", 0)
-
-    # Check for about section
-    if has_about_section(text):
-        score += CLASSIFICATION_WEIGHTS.get("has_about_section", 0)
-
-    # Check for about link
-    if has_about_link(text):
-        score += CLASSIFICATION_WEIGHTS.get("has_about_link", 0)
-
-    # Check for phrase matches (only count once)
-    phrase_found = False
-    for phrase in PHRASES:
-        if phrase in text:
-            phrase_found = True
-            break
-    if phrase_found:
-        score += CLASSIFICATION_WEIGHTS.get("phrase_match", 0)
-
-    # Check for keyword matches (only count once)
-    keyword_found = False
-    for kw in KEYWORDS:
-        if kw in text:
-            keyword_found = True
-            break
-    if keyword_found:
-        score += CLASSIFICATION_WEIGHTS.get("keyword_match", 0)
-
-    # Check for irrelevant keywords (penalty)
-    for irrelevant_pattern in IRRELEVANT_PATTERNS:
-        if irrelevant_pattern.search(text):
-            score += CLASSIFICATION_WEIGHTS.get("irrelevant_keyword_penalty", 0)
-            break
-
-    # Check if URL contains about keywords
-    for url_pattern in ABOUT_URL_PATTERNS:
-        if url_pattern.search(web_url):
-            score += CLASSIFICATION_WEIGHTS.get("url_contains_about", 0)
-            break
 
+def calculate_scrape_score(business_data: dict) -> float:
+    signals = extract_scrape_signals(business_data)
+    score = 0.0
+    for name, weight in CLASSIFICATION_WEIGHTS.items():
+        if signals.get(name):
+            score += weight
     return score
 
 
-async def is_good_scrape_async(business):
-    business_dict = business.__dict__ if hasattr(business, '__dict__') else business
-    score = calculate_scrape_score(business_dict)
+def scoring_payload(business) -> dict:
+    # Only the fields the scorer reads are pickled across to pool workers.
+    source = business if isinstance(business, dict) else business.__dict__
+    return {field: source.get(field) for field in SCORING_FIELDS}
 
-    # Adjusted threshold - this should be higher to reduce false positives
-    GOOD_SCRAPE_THRESHOLD = 2.0  # Increased from 0.5
-    
+
+def _score_chunk(chunk: List[dict]) -> List[float]:
+    return [calculate_scrape_score(business_data) for business_data in chunk]
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(func: Callable[[list], list], items: Iterable, workers: int, chunksize: int) -> Iterator:
+    if workers <= 1:
+        for chunk in _chunked(items, chunksize):
+            yield from func(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A bounded window of chunks in flight keeps memory flat for huge inputs
+        # while results still come back in input order.
+        pending = deque()
+        for chunk in _chunked(items, chunksize):
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def score_many(businesses: Iterable, workers: int = SCORING_WORKERS, chunksize: int = SCORING_CHUNKSIZE) -> Iterator[float]:
+    return map_chunks(_score_chunk, map(scoring_payload, businesses), workers, chunksize)
+
+
+async def is_good_scrape_async(business):
+    score = calculate_scrape_score(scoring_payload(business))
     return score >= GOOD_SCRAPE_THRESHOLD, score
 
 
@@ -93,10 +157,11 @@ async def find_bad_scrapes(businesses):
 
     bad_scrapes = []
     good_scrapes = []
-    tasks = [is_good_scrape_async(b) for b in businesses_with_content]
-    results = await asyncio.gather(*tasks)
+    workers = max(1, min(SCORING_WORKERS, len(businesses_with_content) // SCORING_CHUNKSIZE))
+    scores = await asyncio.to_thread(lambda: list(score_many(businesses_with_content, workers=workers)))
 
-    for business, (is_good, score) in zip(businesses_with_content, results):
+    for business, score in zip(businesses_with_content, scores):
+        is_good = score >= GOOD_SCRAPE_THRESHOLD
         business_info = {
             '_id': business._id,
             'company_name': business.company_name,
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from config import (
+    DEAD_DOMAIN_INDEX_PATH, DEAD_DOMAIN_TTL_SECONDS, DNS_PREFILTER_CONCURRENCY, DNS_TIMEOUT_SECONDS,
+    DNS_CANARY_DOMAIN, PARKED_DOMAIN_MARKERS
+)
+from about_links import clean_url
+
+ALIVE = "alive"
+DEAD = "dead"
+PARKED = "parked"
+UNKNOWN = "unknown"
+
+# Only "name does not exist" answers count as dead; temporary resolver failures
+# leave the domain to be scraped as usual.
+_NXDOMAIN_ERRORS = {getattr(socket, name) for name in ("EAI_NONAME", "EAI_NODATA") if hasattr(socket, name)}
+
+
+def lookup_host(url: Optional[str]) -> str:
+    # The hostname exactly as the business wrote it. Unlike host_key, "www." is kept:
+    # a live www host often has a bare domain with no address or a parking CNAME.
+    cleaned_url = clean_url(url) if url else ""
+    return (urlparse(cleaned_url).hostname or "") if cleaned_url else ""
+
+
+class DeadDomainIndex:
+    # Domains found dead or parked, with the time they were checked. Entries older
+    # than the TTL are ignored and resolved again, since domains get re-registered.
+    def __init__(self, path: Path = DEAD_DOMAIN_INDEX_PATH, ttl_seconds: float = DEAD_DOMAIN_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable dead-domain index {self.path.name}: {e}")
+
+    def get(self, domain: str) -> Optional[Dict]:
+        entry = self.entries.get(domain)
+        if entry is None or time.time() - entry['checked_at'] >= self.ttl_seconds:
+            return None
+        return entry
+
+    def mark(self, domain: str, state: str, reason: str):
+        self.entries[domain] = {'state': state, 'reason': reason, 'checked_at': time.time()}
+
+    def save(self):
+        now = time.time()
+        live_entries = {domain: entry for domain, entry in self.entries.items()
+                        if now - entry['checked_at'] < self.ttl_seconds}
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(live_entries, f)
+        tmp_path.replace(self.path)
+
+
+async def resolve_domain(domain: str, timeout: float = DNS_TIMEOUT_SECONDS,
+                         executor: Optional[ThreadPoolExecutor] = None):
+    loop = asyncio.get_running_loop()
+    started = asyncio.Event()
+
+    def lookup():
+        loop.call_soon_threadsafe(started.set)
+        return socket.getaddrinfo(domain, 443, type=socket.SOCK_STREAM, flags=socket.AI_CANONNAME)
+
+    resolution = loop.run_in_executor(executor, lookup)
+    # The timeout covers the lookup itself, not time spent queued for a thread.
+    await started.wait()
+    try:
+        infos = await asyncio.wait_for(resolution, timeout)
+    except asyncio.TimeoutError:
+        return UNKNOWN, f"DNS lookup timed out after {timeout}s"
+    except socket.gaierror as e:
+        if e.errno in _NXDOMAIN_ERRORS:
+            return DEAD, f"Domain does not resolve: {e.strerror}"
+        return UNKNOWN, f"DNS lookup failed: {e.strerror}"
+    except (OSError, UnicodeError) as e:
+        return UNKNOWN, f"DNS lookup failed: {e}"
+
+    canonical_name = next((info[3] for info in infos if info[3]), "").lower().rstrip('.')
+    for marker in PARKED_DOMAIN_MARKERS:
+        if canonical_name == marker or canonical_name.endswith('.' + marker):
+            return PARKED, f"Domain is parked (resolves via {canonical_name})"
+    return ALIVE, f"Resolved to {infos[0][4][0]}"
+
+
+async def prefilter_domains(domains: Iterable[str], index: DeadDomainIndex,
+                            concurrency: int = DNS_PREFILTER_CONCURRENCY) -> Dict[str, Dict]:
+    # Returns {domain: index entry} for every domain that should not be scraped.
+    domains = [domain for domain in dict.fromkeys(domains) if domain]
+    skipped = {}
+    to_resolve = []
+    for domain in domains:
+        entry = index.get(domain)
+        if entry is not None:
+            skipped[domain] = entry
+        else:
+            to_resolve.append(domain)
+
+    # Lookups get their own threads: the default executor is much smaller than the
+    # concurrency, and timed-out lookups would keep its threads from the HTTP scrapes.
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dns-prefilter")
+    try:
+        if to_resolve:
+            canary_state, canary_reason = await resolve_domain(DNS_CANARY_DOMAIN, executor=executor)
+            if canary_state != ALIVE:
+                # Without a working resolver every lookup fails and would look like a dead domain.
+                print(f"DNS prefilter: resolver check on {DNS_CANARY_DOMAIN} failed ({canary_reason}); "
+                      f"skipping {len(skipped)} domains from the index only.")
+                return skipped
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(domain):
+            async with semaphore:
+                return domain, await resolve_domain(domain, executor=executor)
+
+        results = await asyncio.gather(*(check(domain) for domain in to_resolve))
+    finally:
+        # Lookups that timed out finish in the background; nothing waits for them.
+        executor.shutdown(wait=False, cancel_futures=True)
+    alive = sum(1 for _, (state, _) in results if state == ALIVE)
+    found = [(domain, state, reason) for domain, (state, reason) in results if state in (DEAD, PARKED)]
+    for domain, state, reason in found:
+        index.mark(domain, state, reason)
+        skipped[domain] = index.get(domain)
+    index.save()
+    print(f"DNS prefilter: {len(domains)} domains, {len(to_resolve)} looked up ({alive} alive), "
+          f"{len(skipped)} dead or parked ({len(skipped) - len(found)} from the index).")
+    return skipped
@@ -0,0 +1,35 @@
+from collections import OrderedDict
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from scrape_scheduler import host_key
+
+
+class DomainGroup:
+    def __init__(self, domain: str, members: List):
+        self.domain = domain
+        self.members = members
+        self.representative = min(members, key=lambda business: _path_depth(business.web_url))
+
+    @property
+    def shared_members(self) -> List:
+        return [business for business in self.members if business is not self.representative]
+
+
+def _path_depth(url: str) -> int:
+    # The homepage-like URL is the best stand-in for every business on the domain.
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    path = parsed.path.strip('/')
+    return (path.count('/') + 1 if path else 0) * 1000 + len(path) + (1 if parsed.query else 0)
+
+
+def group_by_domain(businesses: List) -> List[DomainGroup]:
+    # Groups on the exact host (minus "www."), not the registrable domain: subdomains
+    # on shared hosting platforms usually belong to unrelated businesses.
+    groups: Dict[str, List] = OrderedDict()
+    for business in businesses:
+        domain = host_key(business.web_url) or f"_id:{business._id}"
+        groups.setdefault(domain, []).append(business)
+    return [DomainGroup(domain, members) for domain, members in groups.items()]
@@ -0,0 +1,113 @@
+import argparse
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import (
+    CLASSIFICATION_WEIGHTS, GOOD_SCRAPE_THRESHOLD, SCORING_WORKERS, SCORING_CHUNKSIZE,
+    FEATURE_MATRIX_CACHE_PATH
+)
+from detect_poor_scrape import extract_scrape_signals, map_chunks, scoring_payload
+from load_data import iter_businesses, resolve_data_path
+
+FEATURE_NAMES = list(CLASSIFICATION_WEIGHTS)
+
+
+def _feature_chunk(chunk: List[dict]) -> List[Tuple[int, ...]]:
+    rows = []
+    for business_data in chunk:
+        signals = extract_scrape_signals(business_data)
+        rows.append(tuple(1 if signals.get(name) else 0 for name in FEATURE_NAMES))
+    return rows
+
+
+def build_feature_matrix(businesses: Iterable, workers: int = SCORING_WORKERS,
+                         chunksize: int = SCORING_CHUNKSIZE) -> np.ndarray:
+    rows = map_chunks(_feature_chunk, map(scoring_payload, businesses), workers, chunksize)
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.uint8)
+    return flat.reshape(-1, len(FEATURE_NAMES))
+
+
+def weight_vector(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    weights = CLASSIFICATION_WEIGHTS if weights is None else weights
+    return np.array([weights.get(name, 0.0) for name in FEATURE_NAMES], dtype=np.float64)
+
+
+def score_matrix(features: np.ndarray, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    # Equivalent to features @ w, but accumulated column by column in FEATURE_NAMES
+    # order so every score is bit-identical to calculate_scrape_score and
+    # threshold comparisons agree exactly.
+    w = weight_vector(weights)
+    scores = np.zeros(features.shape[0], dtype=np.float64)
+    for j in range(features.shape[1]):
+        scores += features[:, j] * w[j]
+    return scores
+
+
+def sweep_thresholds(scores: np.ndarray, thresholds: Sequence[float]) -> List[Dict[str, float]]:
+    total = len(scores)
+    results = []
+    for threshold in thresholds:
+        good = int(np.count_nonzero(scores >= threshold))
+        results.append({
+            'threshold': float(threshold),
+            'good': good,
+            'bad': total - good,
+            'good_fraction': good / total if total else 0.0
+        })
+    return results
+
+
+def save_feature_matrix(path: Path, features: np.ndarray, ids: Sequence[str], source: Path):
+    np.savez(path, features=features, ids=np.array(ids, dtype=object), feature_names=np.array(FEATURE_NAMES),
+             source=str(source), source_mtime=source.stat().st_mtime)
+
+
+def load_feature_matrix(path: Path, source: Path) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    if not Path(path).exists():
+        return None
+    with np.load(path, allow_pickle=True) as cached:
+        if list(cached['feature_names']) != FEATURE_NAMES or str(cached['source']) != str(source) \
+                or float(cached['source_mtime']) != source.stat().st_mtime:
+            return None
+        return cached['features'], cached['ids']
+
+
+def cached_feature_matrix(source: Optional[Path] = None, cache_path: Path = FEATURE_MATRIX_CACHE_PATH,
+                          workers: int = SCORING_WORKERS) -> Tuple[np.ndarray, np.ndarray]:
+    source = Path(source) if source is not None else resolve_data_path()
+    cached = load_feature_matrix(cache_path, source)
+    if cached is not None:
+        print(f"Loaded cached feature matrix from {Path(cache_path).name}")
+        return cached
+
+    print(f"Building feature matrix from {source.name} with {workers} workers...")
+    ids = []
+
+    def payloads():
+        for business in iter_businesses(source, fields=['_id', 'combined_text', 'about_text', 'raw_text', 'web_url']):
+            ids.append(business._id)
+            yield business
+
+    features = build_feature_matrix(payloads(), workers=workers)
+    save_feature_matrix(cache_path, features, ids, source)
+    print(f"Saved {features.shape[0]} x {features.shape[1]} feature matrix to {Path(cache_path).name}")
+    return features, np.array(ids, dtype=object)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep good-scrape thresholds over the cached feature matrix.")
+    parser.add_argument("--thresholds", type=float, nargs="+",
+                        default=[GOOD_SCRAPE_THRESHOLD - 1.0, GOOD_SCRAPE_THRESHOLD - 0.5, GOOD_SCRAPE_THRESHOLD,
+                                 GOOD_SCRAPE_THRESHOLD + 0.5, GOOD_SCRAPE_THRESHOLD + 1.0])
+    parser.add_argument("--source", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=SCORING_WORKERS)
+    args = parser.parse_args()
+
+    features, _ = cached_feature_matrix(args.source, workers=args.workers)
+    scores = score_matrix(features)
+    print(f"\n=== THRESHOLD SWEEP ({len(scores)} businesses) ===")
+    for row in sweep_thresholds(scores, args.thresholds):
+        print(f"threshold {row['threshold']:.2f}: good {row['good']} | bad {row['bad']} | good fraction {row['good_fraction']:.1%}")
@@ -1,19 +1,31 @@
 import re
+from typing import Tuple
 from bs4 import BeautifulSoup
 
-def has_about_link(html: str) -> bool:
-    soup = BeautifulSoup(html, "html.parser")
+MARKUP_PATTERN = re.compile(r'<[a-zA-Z]')
+ABOUT_HEADING_PATTERN = re.compile(r'^\s*About\b', re.IGNORECASE)
+
+def looks_like_markup(text: str) -> bool:
+    # Scraped innerText has no tags, and without tags neither check below can match.
+    return bool(text) and MARKUP_PATTERN.search(text) is not None
+
+def _has_about_link(soup) -> bool:
     for nav in soup.find_all(['nav', 'header', 'ul']):
         for a in nav.find_all('a', href=True):
             if 'about' in a['href'].lower():
                 return True
     return False
 
-def has_about_section(html: str) -> bool:
-    soup = BeautifulSoup(html, "html.parser")
+def _has_about_section(soup) -> bool:
     if soup.select_one('section.about, div#about, div[class*=about]'):
         return True
     for h in soup.find_all(re.compile('^h[1-6]$')):
-        if re.match(r'^\s*About\b', h.get_text(strip=True), re.IGNORECASE):
+        if ABOUT_HEADING_PATTERN.match(h.get_text(strip=True)):
             return True
-    return False
\ No newline at end of file
+    return False
+
+def detect_about_markup(html: str) -> Tuple[bool, bool]:
+    if not looks_like_markup(html):
+        return False, False
+    soup = BeautifulSoup(html, "html.parser")
+    return _has_about_section(soup), _has_about_link(soup)
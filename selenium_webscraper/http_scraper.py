@@ -0,0 +1,341 @@
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urljoin
+
+from config import (
+    REQUEST_HEADERS, HTTP_TIMEOUT_SECONDS, HTTP_POOL_MAXSIZE, HTTP_MAX_RESPONSE_BYTES, HTTP_CRAWL_THREADS,
+    ABOUT_SECTION_SELECTORS, NAV_SELECTORS, HIDDEN_SELECTORS, MIN_CONTENT_LENGTH,
+    JS_SHELL_MARKERS, JS_SHELL_MAX_TEXT_LENGTH, HTTP_HOST_CONCURRENCY, HTTP_HOST_SPACING_SECONDS
+)
+from about_links import clean_url, normalize_url, select_about_candidates
+from about_crawl import AboutCrawl
+from path_probe import path_hit_stats, probe_url
+from page_cache import get_page_cache, content_digest
+from span_timing import SpanRecorder
+from scrape_events import Event, ScrapeLog
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    print("requests not found, HTTP fast path disabled. Please install it: pip install requests", file=sys.stderr)
+    requests = None
+
+try:
+    from bs4 import BeautifulSoup, UnicodeDammit
+except ImportError:
+    print("BeautifulSoup not found. Please install it: pip install beautifulsoup4", file=sys.stderr)
+    BeautifulSoup = UnicodeDammit = None
+
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+
+_session = None
+_session_lock = threading.Lock()
+_crawl_executor = None
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(REQUEST_HEADERS)
+            _session = session
+    return _session
+
+
+def get_crawl_executor() -> ThreadPoolExecutor:
+    global _crawl_executor
+    with _session_lock:
+        if _crawl_executor is None:
+            _crawl_executor = ThreadPoolExecutor(max_workers=HTTP_CRAWL_THREADS, thread_name_prefix="about-crawl")
+    return _crawl_executor
+
+
+def decode_html(body: bytes, declared_encoding: Optional[str]) -> str:
+    # The header charset wins when Python knows it; otherwise <meta> and byte sniffing decide.
+    if UnicodeDammit is not None:
+        html = UnicodeDammit(body, [declared_encoding] if declared_encoding else [], is_html=True).unicode_markup
+        if html is not None:
+            return html
+    try:
+        return body.decode(declared_encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def fetch_html(url: str, debug_log: ScrapeLog, revalidate: bool = False) -> Tuple[Optional[str], str]:
+    # revalidate=True asks the server even when the cached copy is still fresh.
+    cache = get_page_cache()
+    cached = cache.lookup(url) if cache is not None else None
+    if cached is not None and cached.fresh and not (revalidate and cached.html is not None):
+        debug_log.event(Event.CACHE_HIT, url=url, age_hours=round((time.time() - cached.fetched_at) / 3600, 1),
+                        code=cached.status_code if cached.html is None else None)
+        return cached.html, cached.final_url or url
+
+    headers = {}
+    if cached is not None and cached.html is not None:
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+    try:
+        with get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS, stream=True, allow_redirects=True) as response:
+            if response.status_code == 304 and headers:
+                cache.revalidated(url)
+                debug_log.event(Event.CACHE_REVALIDATED, url=url)
+                return cached.html, cached.final_url or url
+            if response.status_code >= 400:
+                debug_log.event(Event.HTTP_ERROR, url=url, code=response.status_code)
+                if cache is not None and response.status_code in (404, 410):
+                    cache.store(url, final_url=response.url, status_code=response.status_code)
+                return None, response.url
+            content_type = response.headers.get('Content-Type', '')
+            if 'html' not in content_type.lower():
+                debug_log.event(Event.NON_HTML, url=url, content_type=content_type)
+                if cache is not None:
+                    cache.store(url, final_url=response.url, status_code=response.status_code)
+                return None, response.url
+
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body.extend(chunk)
+                if len(body) >= HTTP_MAX_RESPONSE_BYTES:
+                    debug_log.event(Event.RESPONSE_TRUNCATED, url=url, bytes=HTTP_MAX_RESPONSE_BYTES)
+                    # Cut at a tag end so a split multi-byte character does not throw off detection.
+                    del body[body.rfind(b'>') + 1:]
+                    break
+            encoding = response.encoding if 'charset' in content_type.lower() else None
+            html = decode_html(bytes(body), encoding)
+            if cache is not None:
+                cache.store(url, final_url=response.url, status_code=response.status_code, html=html,
+                            etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+            return html, response.url
+    except requests.RequestException as e:
+        debug_log.event(Event.FETCH_FAILED, url=url, error=e)
+        return None, url
+
+
+def fetch_page_hash(url: str, debug_log: ScrapeLog) -> Optional[str]:
+    html, _ = fetch_html(url, debug_log, revalidate=True)
+    return content_digest(html) if html is not None else None
+
+
+def extract_content_from_html(soup, debug_log: ScrapeLog) -> str:
+    # Mirrors selenium_scraper.EXTRACT_CONTENT_SCRIPT so both tiers pick and clean text the same way.
+    for tag in soup(['script', 'style', 'noscript', 'template']):
+        tag.decompose()
+    for selector in NAV_SELECTORS + HIDDEN_SELECTORS:
+        for tag in soup.select(selector):
+            tag.decompose()
+    # Without a browser only inline styles show what is hidden.
+    for tag in soup.find_all(style=HIDDEN_STYLE):
+        tag.decompose()
+
+    best_selector, best_text = None, ""
+    for selector in ABOUT_SECTION_SELECTORS:
+        matches = soup.select(selector)
+        if not matches:
+            continue
+        match_ids = {id(element) for element in matches}
+        outermost = [el for el in matches if not any(id(parent) in match_ids for parent in el.parents)]
+        text = " ".join(filter(None, (el.get_text(separator=' ', strip=True) for el in outermost)))
+        if best_selector is None or (len(best_text) < MIN_CONTENT_LENGTH and len(text) > len(best_text)):
+            best_selector, best_text = selector, text
+
+    if best_selector is None or len(best_text) < MIN_CONTENT_LENGTH:
+        if soup.body is None and best_selector is None:
+            debug_log.event(Event.NO_BODY)
+            return ""
+        body_text = (soup.body or soup).get_text(separator=' ', strip=True)
+        if best_selector is None or len(body_text) > len(best_text):
+            best_selector, best_text = "body", body_text
+
+    debug_log.event(Event.CONTENT_EXTRACTED, chars=len(best_text), selector=best_selector)
+    return best_text
+
+
+def extract_links_from_html(soup, base_url: str) -> List[Tuple[str, str]]:
+    return [(urljoin(base_url, a['href']), a.get_text(' ', strip=True)) for a in soup.find_all('a', href=True)]
+
+
+def looks_like_js_shell(html: str, text: str) -> bool:
+    return len(text) < JS_SHELL_MAX_TEXT_LENGTH and any(marker.search(html) for marker in JS_SHELL_MARKERS)
+
+
+def _fetch_page(url: str, debug_log: ScrapeLog):
+    html, final_url = fetch_html(url, debug_log)
+    if html is None:
+        return None, final_url, "", []
+    soup = BeautifulSoup(html, 'html.parser')
+    links = extract_links_from_html(soup, final_url)
+    text = extract_content_from_html(soup, debug_log)
+    return html, final_url, text, links
+
+
+def scrape_about_page_http(business_id: str, url: str) -> Dict[str, Any]:
+    debug_log = ScrapeLog()
+    debug_log.event(Event.SCRAPE_STARTED, tier="http", url=url)
+    spans = SpanRecorder()
+    result = {
+        "scraped_content": "",
+        "status": "http_not_attempted",
+        "final_url_attempted": url,
+        "debug_log": debug_log.records,
+        "business_id": business_id,
+        "fetch_tier": "http",
+        "needs_browser": True,
+        "spans": spans.spans
+    }
+    if requests is None or BeautifulSoup is None:
+        debug_log.event(Event.HTTP_UNAVAILABLE)
+        return result
+
+    normalized_initial_url = normalize_url(url, debug_log)
+    if not normalized_initial_url:
+        result["status"] = "failed_invalid_initial_url"
+        result["needs_browser"] = False
+        return result
+
+    with spans.span("http_homepage"):
+        html, final_url, initial_content, links = _fetch_page(normalized_initial_url, debug_log)
+    result["final_url_attempted"] = final_url
+    if html is None:
+        result["status"] = "http_fetch_failed"
+        return result
+    if looks_like_js_shell(html, initial_content):
+        result["status"] = "http_js_shell"
+        debug_log.event(Event.JS_SHELL)
+        return result
+
+    if len(initial_content) >= MIN_CONTENT_LENGTH:
+        result.update(scraped_content=initial_content, status="success_content_found", needs_browser=False)
+        debug_log.event(Event.CONTENT_ENOUGH, chars=len(initial_content))
+        return result
+
+    debug_log.event(Event.CONTENT_TOO_SHORT, chars=len(initial_content), next="probe")
+    pacer = HostPacer()
+    with spans.span("http_probe"):
+        probe = probe_known_paths(final_url, initial_content, debug_log, pacer)
+    if probe.done:
+        return _direct_path_result(result, probe)
+
+    found = select_about_candidates(links, normalized_initial_url, final_url, debug_log)
+    probed = set(probe.candidates)
+    candidates = [url for url in found if url not in probed]
+    if not candidates:
+        if probe.best_score is not None:
+            return _direct_path_result(result, probe)
+        # Links that were all covered by the probe are not the same as no about link at all.
+        result["status"] = "http_about_candidates_exhausted" if found else "http_no_about_link_found"
+        return result
+
+    with spans.span("http_crawl"):
+        crawl = crawl_about_candidates(candidates, debug_log, pacer)
+    status, about_final_url, about_content = crawl.outcome("http_content_too_short_followed")
+    if probe.best_score is not None and (status != "success_followed_link" or probe.best_score > crawl.best_score):
+        return _direct_path_result(result, probe)
+    if status == "success_followed_link":
+        result.update(scraped_content=about_content, status=status, final_url_attempted=about_final_url, needs_browser=False)
+        debug_log.event(Event.FOLLOWED_SUCCESS, chars=len(about_content))
+        return result
+
+    result["status"] = status
+    debug_log.event(Event.ESCALATE_BROWSER, status=status)
+    return result
+
+
+def _direct_path_result(result: Dict[str, Any], probe: AboutCrawl) -> Dict[str, Any]:
+    result.update(scraped_content=probe.best_content, status="success_direct_path",
+                  final_url_attempted=probe.best_url, needs_browser=False)
+    probe.debug_log.event(Event.DIRECT_PATH_SUCCESS, url=probe.best_url, chars=len(probe.best_content))
+    return result
+
+
+def _fetch_candidate(url: str):
+    debug_log = ScrapeLog()
+    html, final_url, text, _ = _fetch_page(url, debug_log)
+    return html, final_url, text, debug_log
+
+
+class HostPacer:
+    # One business's follow-up fetches to its host, probe and candidate crawl together:
+    # at most `concurrency` in flight and starts at least `spacing` seconds apart.
+    def __init__(self, concurrency: int = HTTP_HOST_CONCURRENCY, spacing: float = HTTP_HOST_SPACING_SECONDS):
+        self.concurrency = concurrency
+        self.spacing = spacing
+        self._next_start = 0.0
+
+    def delay(self) -> float:
+        return max(0.0, self._next_start - time.monotonic())
+
+    def started(self):
+        self._next_start = time.monotonic() + self.spacing
+
+
+def probe_known_paths(base_url: str, homepage_text: str, debug_log: ScrapeLog,
+                      pacer: Optional[HostPacer] = None) -> AboutCrawl:
+    path_of = {probe_url(base_url, path): path for path in path_hit_stats.ordered()}
+    homepage = clean_url(base_url).rstrip('/')
+
+    def fetch_probe(url: str):
+        html, final_url, text, fetch_log = _fetch_candidate(url)
+        # Many sites answer unknown paths with 200 and the homepage (a soft 404).
+        if html is not None and (clean_url(final_url).rstrip('/') == homepage or text == homepage_text):
+            fetch_log.event(Event.PROBE_SOFT_404, url=url)
+            html = None
+        path_hit_stats.record(path_of[url], html is not None and len(text) >= MIN_CONTENT_LENGTH
+                              and not looks_like_js_shell(html, text))
+        return html, final_url, text, fetch_log
+
+    return _crawl(AboutCrawl(list(path_of), debug_log), pacer or HostPacer(), fetch_probe, "probe", debug_log)
+
+
+def crawl_about_candidates(candidates: List[str], debug_log: ScrapeLog, pacer: Optional[HostPacer] = None) -> AboutCrawl:
+    return _crawl(AboutCrawl(candidates, debug_log), pacer or HostPacer(), _fetch_candidate, "candidate", debug_log)
+
+
+def _crawl(crawl: AboutCrawl, pacer: HostPacer, fetch, label: str, debug_log: ScrapeLog) -> AboutCrawl:
+    # A small sliding window of fetches per business: parallel enough to hide latency,
+    # small enough to stay polite to one host, and nothing new starts once a page is good.
+    executor = get_crawl_executor()
+    in_flight = set()
+    while True:
+        while len(in_flight) < pacer.concurrency and crawl.position < crawl.total and not crawl.done:
+            if pacer.delay() > 0:
+                # Wait out the spacing on the fetches already running, so a good page can end the crawl first.
+                if in_flight:
+                    break
+                time.sleep(pacer.delay())
+            url = crawl.next_candidate()
+            if url is None:
+                break
+            debug_log.event(Event.CANDIDATE_FETCH, kind=label, position=crawl.position, total=crawl.total, url=url)
+            pacer.started()
+            in_flight.add(executor.submit(fetch, url))
+        if not in_flight:
+            break
+        more_to_start = len(in_flight) < pacer.concurrency and crawl.position < crawl.total
+        finished, in_flight = wait(in_flight, timeout=pacer.delay() if more_to_start else None,
+                                   return_when=FIRST_COMPLETED)
+        for future in finished:
+            html, final_url, text, fetch_log = future.result()
+            debug_log.extend(fetch_log.records)
+            if html is None:
+                crawl.fail("http_fetch_failed")
+            elif looks_like_js_shell(html, text):
+                crawl.fail("http_js_shell")
+            elif not crawl.done:
+                crawl.offer(final_url, text)
+        if crawl.done:
+            for future in in_flight:
+                future.cancel()
+            break
+    return crawl
@@ -1,7 +1,16 @@
 import json
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
-from config import DATA_PATH
+import sys
+from dataclasses import dataclass, fields as dataclass_fields
+from itertools import islice
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable, Iterator
+from config import DATA_PATH, COLUMNAR_DATA_PATH
+
+try:
+    import ijson
+except ImportError:
+    print("ijson not found, crawl JSON will be loaded in one piece. Please install it: pip install ijson", file=sys.stderr)
+    ijson = None
 
 @dataclass
 class Business:
@@ -44,32 +53,77 @@ class Business:
     selenium_scraped_content_length: Optional[int] = None
     selenium_debug_info: Optional[Dict[str, Any]] = None
 
-def load_businesses(path: str = DATA_PATH) -> List[Business]:
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    businesses = []
-    for item in data:
+BUSINESS_FIELDS = [f.name for f in dataclass_fields(Business)]
+
+def resolve_data_path() -> Path:
+    # Prefer the columnar copy written by columnar_store.py unless the JSON export is newer.
+    if COLUMNAR_DATA_PATH.exists() and (
+        not DATA_PATH.exists() or COLUMNAR_DATA_PATH.stat().st_mtime >= DATA_PATH.stat().st_mtime
+    ):
+        print(f"Using columnar copy {COLUMNAR_DATA_PATH.name} (not older than {DATA_PATH.name}).")
+        return COLUMNAR_DATA_PATH
+    return DATA_PATH
+
+def iter_records(path: str = DATA_PATH) -> Iterator[Dict[str, Any]]:
+    path = Path(path)
+    if path.suffix == '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data
+
+def iter_businesses(path: Optional[str] = None, fields: Optional[Iterable[str]] = None) -> Iterator[Business]:
+    # With fields given, every other Business attribute is left as None so large
+    # text columns are dropped as soon as each record is parsed.
+    wanted = set(fields) if fields is not None else None
+    if wanted is not None:
+        unknown = wanted - set(BUSINESS_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown Business fields requested: {sorted(unknown)}")
+
+    path = Path(path) if path is not None else resolve_data_path()
+    if path.suffix in ('.arrow', '.feather'):
+        from columnar_store import iter_businesses_arrow
+        yield from iter_businesses_arrow(path, wanted)
+        return
+
+    for item in iter_records(path):
+        if wanted is not None:
+            yield Business(**{name: item.get(name) if name in wanted else None for name in BUSINESS_FIELDS})
+            continue
         if 'selenium_status' not in item:
             item['selenium_status'] = None
         if 'selenium_scraped_content_length' not in item:
             item['selenium_scraped_content_length'] = None
         if 'selenium_debug_info' not in item:
             item['selenium_debug_info'] = None
-        businesses.append(Business(**item))
-    return businesses
+        yield Business(**item)
+
+def load_businesses(path: Optional[str] = None, fields: Optional[Iterable[str]] = None) -> List[Business]:
+    return list(iter_businesses(path, fields))
 
 def print_all_combined_texts(limit: Optional[int] = None):
-    businesses = load_businesses()
-    
-    if not businesses:
-        print("No businesses loaded to display combined_text.")
-        return
+    businesses = iter_businesses(fields=[
+        'company_name', 'web_url', 'selenium_status', 'selenium_scraped_content_length',
+        'combined_text', 'selenium_debug_info'
+    ])
 
-    display_count = limit if limit is not None else len(businesses)
-    print(f"Displaying combined_text for the first {display_count} businesses:")
+    if limit is not None:
+        print(f"Displaying combined_text for the first {limit} businesses:")
+    else:
+        print("Displaying combined_text for all businesses:")
     print("=" * 80)
 
-    for i, biz in enumerate(businesses[:display_count]):
+    displayed = 0
+    for i, biz in enumerate(islice(businesses, limit)):
+        displayed += 1
         print(f"\n--- Business {i+1} ---")
         print(f"Company Name: {biz.company_name}")
         print(f"Web URL: {biz.web_url if biz.web_url else '[N/A]'}")
@@ -78,3 +132,6 @@ def print_all_combined_texts(limit: Optional[int] = None):
         print(f"Combined Text Snippet: {biz.combined_text[:200] + '...' if biz.combined_text else '[N/A]'}")
         if biz.selenium_debug_info:
             print(f"Selenium Debug Info Snippet: {str(biz.selenium_debug_info)[:200] + '...'}")
+
+    if not displayed:
+        print("No businesses loaded to display combined_text.")
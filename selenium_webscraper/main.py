@@ -1,37 +1,96 @@
+import argparse
 import asyncio
 import time
 import json
 import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 import sys
 
 sys.path.append(str(Path(__file__).resolve().parent))
 
-from config import DATA_PATH, CLASSIFICATION_WEIGHTS, PROCESS_TIMEOUT_SECONDS, MIN_CONTENT_LENGTH, BATCH_SIZE, REQUEST_DELAY_SECONDS, BATCH_DELAY_SECONDS
-from load_data import load_businesses, Business
+from config import (
+    CLASSIFICATION_WEIGHTS, MIN_CONTENT_LENGTH, SCRAPER_POOL_SIZE,
+    MAX_CONCURRENT_SCRAPES, PER_HOST_MAX_CONCURRENCY, PER_HOST_DELAY_SECONDS, RESULTS_JOURNAL_PATH, GOOD_SCRAPE_THRESHOLD,
+    SCRAPE_PROFILE, TABS_PER_WORKER, DNS_PREFILTER_ENABLED, INCREMENTAL_TTL_SECONDS, DEBUG_LOG_VERBOSITY,
+    PAGE_LOAD_STATS
+)
+from load_data import load_businesses, resolve_data_path, Business
 from detect_poor_scrape import get_bad_scrapes, calculate_scrape_score
-from selenium_scraper import scrape_about_page_selenium
-
-GOOD_ENOUGH_SCORE_THRESHOLD = 2.0
-
-async def run_full_pipeline():
+from worker_pool import ScraperPool
+from scrape_scheduler import ScrapeScheduler, HostCircuitOpen
+from dns_prefilter import DeadDomainIndex, prefilter_domains, lookup_host
+from domain_groups import group_by_domain
+from http_scraper import scrape_about_page_http, fetch_page_hash
+from path_probe import path_hit_stats
+from page_cache import get_page_cache, set_page_cache_enabled, content_digest
+from results_journal import ResultsJournal, apply_journal_record, journal_record_for
+from scrape_state import ScrapeStateStore, apply_scrape_state, is_retryable_status
+from span_timing import SpanLog, SpanStats
+from scrape_events import (
+    Event, ScrapeLog, EventSidecar, LEVELS, DETAIL, event_record, keep_records, describe, set_capture_level
+)
+
+GOOD_ENOUGH_SCORE_THRESHOLD = GOOD_SCRAPE_THRESHOLD
+
+async def run_full_pipeline(resume: bool = False, journal_path: Path = RESULTS_JOURNAL_PATH, profile: str = SCRAPE_PROFILE,
+                            tabs_per_worker: int = TABS_PER_WORKER, dns_prefilter: bool = DNS_PREFILTER_ENABLED,
+                            incremental: bool = False, verbosity: str = DEBUG_LOG_VERBOSITY,
+                            debug_log_path: Optional[Path] = None, page_load_stats: bool = PAGE_LOAD_STATS):
     print("--- Starting Full Scraping Pipeline ---")
+    # Results keep events at the chosen verbosity; with a sidecar every event is captured
+    # so the sidecar gets the full log, and the results are filtered afterwards.
+    keep_level = LEVELS[verbosity]
+    set_capture_level(DETAIL if debug_log_path else keep_level)
     
-    all_businesses = load_businesses(DATA_PATH)
-    print(f"Loaded {len(all_businesses)} businesses from {DATA_PATH.name}")
+    data_path = resolve_data_path()
+    all_businesses = load_businesses(data_path)
+    print(f"Loaded {len(all_businesses)} businesses from {data_path.name}")
 
     businesses_to_rescrap = []
     business_map = {b._id: b for b in all_businesses}
 
+    journal = ResultsJournal(journal_path)
+    journaled_records = journal.load() if resume else {}
+    resumed_ids = set()
+    for _id, record in journaled_records.items():
+        if _id in business_map:
+            apply_journal_record(business_map[_id], record)
+            resumed_ids.add(_id)
+    if resume:
+        print(f"Resuming: {len(resumed_ids)} businesses already completed in {journal.path.name}")
+
+    state_store = ScrapeStateStore()
+    # Stale successes scraped over HTTP are first checked against the page hash and only re-scraped if it changed.
+    confirm_states = {}
+    count_incremental_kept = 0
+    count_incremental_requeued = 0
+
     print("--- Identifying businesses for re-scraping (bad scrapes based on current classification) ---")
     count_bad_scrapes_identified = 0
     for business in all_businesses:
+        if business._id in resumed_ids:
+            continue
         if not business.web_url:
             business.selenium_status = "skipped_no_url"
-            business.selenium_debug_info = ["Skipped: No web_url provided for this business."]
+            business.selenium_debug_info = [event_record(Event.SKIPPED, reason="no_url")]
             business.selenium_scraped_content_length = 0 
             continue
 
+        if incremental:
+            state = state_store.get(business._id)
+            if state is not None and state.web_url == business.web_url:
+                if is_retryable_status(state.status) or state.age_seconds() >= INCREMENTAL_TTL_SECONDS:
+                    if state.page_hash and state.status.startswith("success"):
+                        confirm_states[business._id] = state
+                    businesses_to_rescrap.append(business)
+                    count_incremental_requeued += 1
+                else:
+                    apply_scrape_state(business, state)
+                    count_incremental_kept += 1
+                continue
+
         existing_data_for_score = {
             'combined_text': business.combined_text,
             'web_url': business.web_url,
@@ -47,65 +106,211 @@ async def run_full_pipeline():
             count_bad_scrapes_identified += 1
         else:
             business.selenium_status = "skipped_prefilter"
-            business.selenium_debug_info = ["Skipped: Existing content deemed sufficient or already successfully scraped."]
+            business.selenium_debug_info = [event_record(Event.SKIPPED, reason="prefilter", score=existing_score)]
             business.selenium_scraped_content_length = getattr(business, 'selenium_scraped_content_length', len(business.combined_text) if business.combined_text else 0)
 
 
     print(f"Identified {count_bad_scrapes_identified} businesses as 'bad scrapes' for potential re-scraping.")
+    if incremental:
+        print(f"Incremental: kept {count_incremental_kept} recent results, re-queued {count_incremental_requeued} stale or retryable "
+              f"({len(confirm_states)} to check for changes first).")
+
+    if dns_prefilter:
+        dead_domains = await prefilter_domains((lookup_host(b.web_url) for b in businesses_to_rescrap), DeadDomainIndex())
+        live_businesses = []
+        for business in businesses_to_rescrap:
+            entry = dead_domains.get(lookup_host(business.web_url))
+            if entry is None:
+                live_businesses.append(business)
+                continue
+            business.selenium_status = "skipped_dead_domain"
+            business.selenium_debug_info = [event_record(Event.SKIPPED, reason=entry['state'], detail=entry['reason'])]
+            business.selenium_scraped_content_length = 0
+        print(f"Skipping {len(businesses_to_rescrap) - len(live_businesses)} businesses whose domains are dead or parked.")
+        businesses_to_rescrap = live_businesses
 
     print(f"Proceeding with all {len(businesses_to_rescrap)} identified bad scrapes for re-scraping.")
 
-    total_businesses_to_process = len(businesses_to_rescrap)
-    processed_count_in_pipeline = 0
-
-    print(f"\n--- Starting Selenium Scraping in Batches (Batch Size: {BATCH_SIZE}, Per Scrape Delay: {REQUEST_DELAY_SECONDS}s, Batch Delay: {BATCH_DELAY_SECONDS}s) ---")
+    # Businesses sharing a website are scraped once and the result copied to each of them.
+    domain_groups = group_by_domain(businesses_to_rescrap)
+    groups_by_representative = {group.representative._id: group for group in domain_groups}
+    representatives = [group.representative for group in domain_groups]
+    print(f"Deduplicated {len(businesses_to_rescrap)} businesses to {len(representatives)} unique domains "
+          f"({len(businesses_to_rescrap) - len(representatives)} scrapes saved).")
+
+    total_businesses_to_process = len(representatives)
+
+    # Keep every browser tab busy even when the pool offers more slots than the default concurrency.
+    max_concurrency = max(MAX_CONCURRENT_SCRAPES, SCRAPER_POOL_SIZE * tabs_per_worker)
+    # The HTTP tier and cache calls block a default-executor thread each; the stock
+    # executor (min(32, cpu + 4) threads) would quietly cap the concurrency on small boxes.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=max_concurrency + 4, thread_name_prefix="scrape"))
+    print(f"\n--- Starting Selenium Scraping (Concurrency: {max_concurrency}, Per Host Concurrency: {PER_HOST_MAX_CONCURRENCY}, Per Host Delay: {PER_HOST_DELAY_SECONDS}s) ---")
     start_time = time.time()
 
-    for i in range(0, total_businesses_to_process, BATCH_SIZE):
-        batch = businesses_to_rescrap[i : i + BATCH_SIZE]
-        current_batch_num = i // BATCH_SIZE + 1
-        total_batches = total_businesses_to_process // BATCH_SIZE + (1 if total_businesses_to_process % BATCH_SIZE else 0)
-        print(f"\n--- Processing Batch {current_batch_num} of {total_batches} ---")
-
-        for business in batch:
-            processed_count_in_pipeline += 1
-            print(f"\n--- Scraping Business {processed_count_in_pipeline}/{total_businesses_to_process} ---")
-            print(f"Company: {business.company_name}")
-            print(f"URL: {business.web_url}")
-
-            scrape_result = {}
-            try:
-                scrape_result = await asyncio.to_thread(scrape_about_page_selenium, business._id, business.web_url)
-
-                business_to_update = business_map[business._id]
-                business_to_update.combined_text = scrape_result['scraped_content'] if scrape_result['scraped_content'] else business_to_update.combined_text
-                business_to_update.selenium_status = scrape_result['status']
-                business_to_update.selenium_scraped_content_length = len(scrape_result['scraped_content']) if scrape_result['scraped_content'] else 0
-                business_to_update.selenium_debug_info = scrape_result['debug_log']
-
-                print(f"Status: {business_to_update.selenium_status}")
-                if business_to_update.combined_text:
-                    print(f"Scraped Text (first 500 chars): {business_to_update.combined_text[:500]}...")
-                else:
-                    print(f"Scraped Text: None")
-
-            except Exception as e:
-                print(f"ERROR during scrape for {business.company_name} ({business.web_url}): {e}")
-                business_to_update = business_map[business._id]
-                business_to_update.selenium_status = f"error_main_pipeline: {e}"
-                business_to_update.selenium_debug_info = getattr(business_to_update, 'selenium_debug_info', [])
-                business_to_update.selenium_debug_info.append(f"Main pipeline error: {e}")
-                business_to_update.selenium_scraped_content_length = 0
-            finally:
-                await asyncio.sleep(REQUEST_DELAY_SECONDS)
-        
-        if i + BATCH_SIZE < total_businesses_to_process:
-            print(f"\n--- Batch {current_batch_num} completed. Waiting {BATCH_DELAY_SECONDS} seconds before next batch ---")
-            await asyncio.sleep(BATCH_DELAY_SECONDS)
-
+    journal.open(resume)
+    span_log = SpanLog()
+    span_log.open(resume)
+    span_stats = SpanStats()
+    sidecar = EventSidecar(debug_log_path) if debug_log_path else None
+    pool = ScraperPool(size=SCRAPER_POOL_SIZE, profile=profile, tabs_per_worker=tabs_per_worker,
+                       page_load_stats=page_load_stats)
+    pool.start()
+    print(f"Started scraper pool with {SCRAPER_POOL_SIZE} warm browser workers x {tabs_per_worker} tabs ('{profile}' page-load profile).")
+    page_load_totals = {"pages": 0, "requests": 0, "blocked_requests": 0, "bytes": 0}
+
+    async def scrape_business(business):
+        start = time.perf_counter()
+        state = confirm_states.get(business._id)
+        if state is None:
+            scrape_result = await scrape_business_live(business)
+        else:
+            scrape_result = await confirm_or_scrape(business, state)
+        scrape_result.setdefault('spans', []).append(["total", round(time.perf_counter() - start, 4)])
+        return scrape_result
+
+    async def confirm_or_scrape(business, state):
+        confirm_log = ScrapeLog()
+        confirm_log.event(Event.CONFIRM_CHECK, url=state.final_url)
+        confirm_start = time.perf_counter()
+        page_hash = await asyncio.to_thread(fetch_page_hash, state.final_url, confirm_log)
+        confirm_span = ["confirm_unchanged", round(time.perf_counter() - confirm_start, 4)]
+        if page_hash == state.page_hash:
+            confirm_log.event(Event.PAGE_UNCHANGED)
+            return {
+                'scraped_content': state.content or "",
+                'status': state.status,
+                'final_url_attempted': state.final_url,
+                'debug_log': confirm_log.records,
+                'business_id': business._id,
+                'fetch_tier': "unchanged",
+                'page_hash': page_hash,
+                'spans': [confirm_span]
+            }
+        confirm_log.event(Event.PAGE_CHANGED, reachable=page_hash is not None)
+        scrape_result = await scrape_business_live(business)
+        scrape_result['debug_log'] = confirm_log.records + scrape_result['debug_log']
+        scrape_result['spans'] = [confirm_span] + scrape_result.get('spans', [])
+        return scrape_result
+
+    async def scrape_business_live(business):
+        http_result = await asyncio.to_thread(scrape_about_page_http, business._id, business.web_url)
+        if not http_result['needs_browser']:
+            return http_result
+
+        cache = get_page_cache()
+        cached = await asyncio.to_thread(cache.lookup, business.web_url, "browser") if cache is not None else None
+        if cached is not None and cached.fresh:
+            return {
+                'scraped_content': cached.text or "",
+                'status': cached.status,
+                'final_url_attempted': cached.final_url,
+                'debug_log': http_result['debug_log'] + [event_record(Event.BROWSER_CACHE_HIT, url=cached.url,
+                                                                      status=cached.status)],
+                'business_id': business._id,
+                'fetch_tier': "cache",
+                'spans': http_result['spans']
+            }
+
+        browser_start = time.perf_counter()
+        # Waiting on the pool's future holds no thread, so browser scrapes are limited only by its slots.
+        scrape_result = await asyncio.wrap_future(pool.submit(business._id, business.web_url))
+        # browser_scrape is wall time seen from here, so it includes waiting for a free worker.
+        scrape_result['spans'] = http_result['spans'] + scrape_result.get('spans', []) \
+            + [["browser_scrape", round(time.perf_counter() - browser_start, 4)]]
+        scrape_result['fetch_tier'] = "selenium"
+        scrape_result['debug_log'] = http_result['debug_log'] + scrape_result['debug_log']
+        if cache is not None and scrape_result['status'].startswith("success"):
+            await asyncio.to_thread(cache.store, business.web_url, "browser", final_url=scrape_result['final_url_attempted'],
+                                    status=scrape_result['status'], text=scrape_result['scraped_content'])
+        return scrape_result
+
+    def record_result(business, scrape_result, error):
+        group = groups_by_representative[business._id]
+        if scrape_result is not None and scrape_result.get('page_load_stats'):
+            page_load_totals["pages"] += 1
+            for key, value in scrape_result['page_load_stats'].items():
+                page_load_totals[key] += value
+        page_hash = None
+        if scrape_result is not None:
+            page_hash = scrape_result.get('page_hash')
+            # Only HTTP-tier text comes straight from the fetched HTML, so only its hash says the content is unchanged.
+            cache = get_page_cache()
+            if page_hash is None and cache is not None and scrape_result.get('fetch_tier') == "http" \
+                    and scrape_result['status'].startswith("success"):
+                page_hash = cache.html_hash(scrape_result['final_url_attempted'])
+        spans = scrape_result.get('spans') if scrape_result is not None else None
+        if sidecar is not None and scrape_result is not None:
+            sidecar.write(business._id, scrape_result['debug_log'])
+        for member in group.members:
+            shared_from = business._id if member is not business else None
+            apply_result(business_map[member._id], scrape_result, error, shared_from, len(group.members))
+            member_to_update = business_map[member._id]
+            previous_state = state_store.get(member._id) if incremental else None
+            if previous_state is not None and scrape_result is not None and scrape_result['fetch_tier'] != "unchanged" \
+                    and scrape_result['scraped_content'] \
+                    and previous_state.content_hash == content_digest(scrape_result['scraped_content']):
+                member_to_update.selenium_debug_info.append(event_record(Event.CONTENT_IDENTICAL))
+            state_store.record(member._id, member.web_url, scrape_result['final_url_attempted'] if scrape_result else None,
+                               member_to_update.selenium_status, scrape_result['scraped_content'] if scrape_result else None,
+                               page_hash)
+        business_to_update = business_map[business._id]
+        span_stats.record(business_to_update.selenium_status, spans)
+        span_log.append({'_id': business._id, 'status': business_to_update.selenium_status,
+                         'fetch_tier': scrape_result.get('fetch_tier') if scrape_result is not None else None,
+                         'shared_with': len(group.members) - 1, 'spans': spans or []})
+        if error is not None:
+            print(f"ERROR during scrape for {business.company_name} ({business.web_url}): {error}")
+            return
+        shared_note = f", shared with {len(group.members) - 1} more on {group.domain}" if len(group.members) > 1 else ""
+        print(f"Scraped {business.company_name} ({business.web_url}) via {scrape_result.get('fetch_tier', 'selenium')} -> {business_to_update.selenium_status}, {business_to_update.selenium_scraped_content_length} chars{shared_note}")
+
+    def apply_result(business_to_update, scrape_result, error, shared_from, group_size):
+        business_to_update.selenium_shared_from = shared_from
+        shared_log = [event_record(Event.SHARED_RESULT, source=shared_from, group=group_size)] if shared_from else []
+        if error is not None:
+            if isinstance(error, HostCircuitOpen):
+                business_to_update.selenium_status = "skipped_host_circuit_open"
+            else:
+                business_to_update.selenium_status = f"error_main_pipeline: {error}"
+            business_to_update.selenium_debug_info = getattr(business_to_update, 'selenium_debug_info', None) or []
+            business_to_update.selenium_debug_info.extend(shared_log + [event_record(Event.PIPELINE_ERROR, error=error)])
+            business_to_update.selenium_scraped_content_length = 0
+            journal.append(journal_record_for(business_to_update))
+            return
+
+        business_to_update.combined_text = scrape_result['scraped_content'] if scrape_result['scraped_content'] else business_to_update.combined_text
+        business_to_update.selenium_status = scrape_result['status']
+        business_to_update.selenium_scraped_content_length = len(scrape_result['scraped_content']) if scrape_result['scraped_content'] else 0
+        business_to_update.selenium_debug_info = shared_log + keep_records(scrape_result['debug_log'], keep_level)
+        journal.append(journal_record_for(business_to_update, scrape_result.get('fetch_tier'), scrape_result['scraped_content']))
+
+    scheduler = ScrapeScheduler(scrape_business, max_concurrency=max_concurrency)
+    try:
+        await scheduler.run(representatives, record_result)
+    finally:
+        await asyncio.to_thread(pool.close)
+        journal.close()
+        span_log.close()
+        state_store.close()
+        if sidecar is not None:
+            sidecar.close()
 
     end_time = time.time()
     print(f"\nSelenium scraping of identified bad scrapes completed in {end_time - start_time:.2f} seconds.")
+    print(pool.latency.summary())
+    print(span_stats.summary())
+    print(path_hit_stats.summary())
+    if get_page_cache() is not None:
+        print(get_page_cache().summary())
+    if page_load_stats and tabs_per_worker > 1:
+        print(f"Browser page loads: not collected with {tabs_per_worker} tabs per worker; run with --tabs 1 to measure them.")
+    elif page_load_totals["pages"]:
+        print(f"Browser page loads ({profile} profile): {page_load_totals['pages']} scrapes, "
+              f"{page_load_totals['requests']} requests, {page_load_totals['blocked_requests']} blocked, "
+              f"{page_load_totals['bytes'] / (1024 * 1024):.1f} MB transferred "
+              f"({page_load_totals['bytes'] / page_load_totals['pages'] / 1024:.0f} KB per scrape).")
 
     processed_businesses_output = []
     for business in all_businesses:
@@ -148,7 +353,8 @@ async def run_full_pipeline():
             'selenium_scraped_data': business.combined_text,
             'selenium_status': getattr(business, 'selenium_status', 'not_processed'),
             'selenium_scraped_content_length': getattr(business, 'selenium_scraped_content_length', 0),
-            'selenium_debug_info': getattr(business, 'selenium_debug_info', [])
+            'selenium_debug_info': getattr(business, 'selenium_debug_info', []),
+            'selenium_shared_from': getattr(business, 'selenium_shared_from', None)
         }
         processed_businesses_output.append(biz_output_dict)
 
@@ -178,7 +384,8 @@ async def run_full_pipeline():
             'original_score': original_score,
             'selenium_score': selenium_score,
             'final_is_good_scrape': is_good_scrape,
-            'selenium_debug_info': biz_data.get('selenium_debug_info')
+            'selenium_debug_info': biz_data.get('selenium_debug_info'),
+            'selenium_shared_from': biz_data.get('selenium_shared_from')
         })
 
     final_good_scrapes_info = []
@@ -201,13 +408,32 @@ async def run_full_pipeline():
     for b in final_bad_scrapes_info[:5]:
         print(f"ID: {b['_id']}, Name: {b['company_name']}, Status: {b['selenium_status']}, Scraped Length: {b['selenium_scraped_content_length']}, Good: {b['final_is_good_scrape']}")
         if b['selenium_debug_info']:
-            print(f"  Selenium Debug Info (last entry): {b['selenium_debug_info'][-1]}")
+            print(f"  Selenium Debug Info (last entry): {describe(b['selenium_debug_info'][-1])}")
 
     output_file = Path("full_business_scrape_results.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
+    tmp_output_file = output_file.with_suffix(".json.tmp")
+    with open(tmp_output_file, 'w', encoding='utf-8') as f:
         json.dump(processed_businesses_output, f, indent=4)
+    tmp_output_file.replace(output_file)
     print(f"\nFull business scrape results saved to {output_file.name}")
 
 
 if __name__ == "__main__":
-    asyncio.run(run_full_pipeline())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Re-scrape businesses with poor existing content.")
+    parser.add_argument("--resume", action="store_true", help="Skip businesses already recorded in the results journal and rebuild output from it.")
+    parser.add_argument("--journal", type=Path, default=RESULTS_JOURNAL_PATH, help="Path of the append-only results journal.")
+    parser.add_argument("--profile", choices=["normal", "lean"], default=SCRAPE_PROFILE, help="Browser page-load profile.")
+    parser.add_argument("--tabs", type=int, default=TABS_PER_WORKER, help="Concurrent scrapes per browser worker, one tab each.")
+    parser.add_argument("--no-cache", action="store_true", help="Fetch every page live and leave the page cache untouched.")
+    parser.add_argument("--incremental", action="store_true", help="Only scrape new records, records older than the state TTL and retryable failures.")
+    parser.add_argument("--no-dns-prefilter", action="store_true", help="Scrape every domain without resolving it first.")
+    parser.add_argument("--verbosity", choices=list(LEVELS), default=DEBUG_LOG_VERBOSITY, help="Lowest event level kept in selenium_debug_info.")
+    parser.add_argument("--page-load-stats", action="store_true", default=PAGE_LOAD_STATS, help="Count requests and bytes per browser scrape from Chrome's performance log (benchmarking; single-tab workers only).")
+    parser.add_argument("--debug-log", type=Path, help="Also write every scrape event, at any level, to this rotating log file.")
+    args = parser.parse_args()
+    if args.no_cache:
+        set_page_cache_enabled(False)
+    asyncio.run(run_full_pipeline(resume=args.resume, journal_path=args.journal, profile=args.profile,
+                                  tabs_per_worker=args.tabs, dns_prefilter=not args.no_dns_prefilter,
+                                  incremental=args.incremental, verbosity=args.verbosity,
+                                  debug_log_path=args.debug_log, page_load_stats=args.page_load_stats))
\ No newline at end of file
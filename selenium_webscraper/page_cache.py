@@ -0,0 +1,212 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from config import PAGE_CACHE_DIR, PAGE_CACHE_TTL_SECONDS, PAGE_CACHE_MAX_BYTES, PAGE_CACHE_ENABLED
+from about_links import clean_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    final_url TEXT,
+    status_code INTEGER,
+    status TEXT,
+    html_hash TEXT,
+    text_hash TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (kind, url)
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def content_digest(data: str) -> str:
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    url: str
+    final_url: Optional[str]
+    status_code: Optional[int]
+    status: Optional[str]
+    html: Optional[str]
+    text: Optional[str]
+    content_hash: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+
+class PageCache:
+    # Entries are keyed by (kind, clean_url(url)): "http" holds raw fetched HTML,
+    # "browser" holds text rendered by the selenium tier. Bodies are gzip files named
+    # by their sha256, so identical pages behind different URLs are stored once.
+    def __init__(self, root: Path = PAGE_CACHE_DIR, ttl_seconds: float = PAGE_CACHE_TTL_SECONDS,
+                 max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    def _write_object(self, data: str) -> str:
+        raw = data.encode('utf-8')
+        digest = content_digest(data)
+        if self._db.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone():
+            return digest
+        path = self._object_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+            f.write(raw)
+        tmp_path.replace(path)
+        size = path.stat().st_size
+        self._db.execute("INSERT INTO objects (hash, size) VALUES (?, ?)", (digest, size))
+        self._total_bytes += size
+        return digest
+
+    def _read_object(self, digest: Optional[str]) -> Optional[str]:
+        if not digest:
+            return None
+        try:
+            with gzip.open(self._object_path(digest), 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def lookup(self, url: str, kind: str = "http") -> Optional[CachedPage]:
+        key = clean_url(url) or url
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT final_url, status_code, status, html_hash, text_hash, etag, last_modified, fetched_at "
+                "FROM pages WHERE kind = ? AND url = ?", (kind, key)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            final_url, status_code, status, html_hash, text_hash, etag, last_modified, fetched_at = row
+            html, text = self._read_object(html_hash), self._read_object(text_hash)
+            if (html_hash and html is None) or (text_hash and text is None):
+                # An object file went missing; drop the entry rather than serve half of it.
+                self._db.execute("DELETE FROM pages WHERE kind = ? AND url = ?", (kind, key))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE pages SET last_access = ? WHERE kind = ? AND url = ?", (now, kind, key))
+            self._db.commit()
+            fresh = now - fetched_at < self.ttl_seconds
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return CachedPage(key, final_url, status_code, status, html, text, html_hash or text_hash,
+                          etag, last_modified, fetched_at, fresh)
+
+    def html_hash(self, url: str, kind: str = "http") -> Optional[str]:
+        # Peeks at the stored body's digest without counting a hit or touching LRU order.
+        key = clean_url(url) or url
+        with self._lock:
+            # Pages reached through a redirect are stored under the URL that was requested.
+            row = self._db.execute("SELECT html_hash FROM pages WHERE kind = ? AND (url = ? OR final_url = ?) "
+                                   "ORDER BY url = ? DESC, fetched_at DESC LIMIT 1", (kind, key, url, key)).fetchone()
+        return row[0] if row else None
+
+    def store(self, url: str, kind: str = "http", final_url: Optional[str] = None, status_code: Optional[int] = None,
+              status: Optional[str] = None, html: Optional[str] = None, text: Optional[str] = None,
+              etag: Optional[str] = None, last_modified: Optional[str] = None):
+        key = clean_url(url) or url
+        now = time.time()
+        with self._lock:
+            html_hash = self._write_object(html) if html is not None else None
+            text_hash = self._write_object(text) if text is not None else None
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (kind, url, final_url, status_code, status, html_hash, text_hash, "
+                "etag, last_modified, fetched_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, final_url, status_code, status, html_hash, text_hash, etag, last_modified, now, now))
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def revalidated(self, url: str, kind: str = "http"):
+        # A 304 answer: the stored body is current again.
+        key = clean_url(url) or url
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE kind = ? AND url = ?",
+                             (now, now, kind, key))
+            self._db.commit()
+
+    def _evict(self):
+        # Least recently used entries go first, down to 90% of the limit so
+        # eviction does not run again on the very next store.
+        target = self.max_bytes * 0.9
+        while self._total_bytes > target:
+            rows = self._db.execute("SELECT kind, url FROM pages ORDER BY last_access LIMIT 200").fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM pages WHERE kind = ? AND url = ?", rows)
+            orphans = self._db.execute(
+                "SELECT hash, size FROM objects WHERE hash NOT IN (SELECT html_hash FROM pages WHERE html_hash IS NOT NULL) "
+                "AND hash NOT IN (SELECT text_hash FROM pages WHERE text_hash IS NOT NULL)").fetchall()
+            for digest, size in orphans:
+                try:
+                    self._object_path(digest).unlink()
+                except FileNotFoundError:
+                    pass
+                self._total_bytes -= size
+            self._db.executemany("DELETE FROM objects WHERE hash = ?", [(digest,) for digest, _ in orphans])
+
+    def summary(self) -> str:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return (f"Page cache: {self.hits} fresh hits, {self.misses} misses/stale; {entries} entries, "
+                f"{self._total_bytes / (1024 * 1024):.1f} MB in {self.root}")
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+_page_cache_enabled = PAGE_CACHE_ENABLED
+
+
+def set_page_cache_enabled(enabled: bool):
+    global _page_cache_enabled
+    _page_cache_enabled = enabled
+
+
+def get_page_cache() -> Optional[PageCache]:
+    global _page_cache
+    if not _page_cache_enabled:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+    return _page_cache
@@ -0,0 +1,51 @@
+import threading
+from collections import Counter
+from typing import List
+from urllib.parse import urlparse, urlunparse
+
+from config import ABOUT_URL_KEYWORDS, PROBE_EXTRA_PATHS, PROBE_MAX_PATHS, PROBE_EXPLORE_SLOTS
+
+# "/about-us" leads because it is the most common about URL; the keyword paths keep
+# their ABOUT_URL_KEYWORDS order (most to least specific).
+PROBE_PATHS = list(dict.fromkeys(PROBE_EXTRA_PATHS[:1] + [f"/{kw}" for kw in ABOUT_URL_KEYWORDS] + PROBE_EXTRA_PATHS[1:]))
+
+
+class PathHitStats:
+    def __init__(self, paths: List[str] = PROBE_PATHS):
+        self.paths = list(paths)
+        self.hits = Counter()
+        self.probes = Counter()
+        self._lock = threading.Lock()
+
+    def ordered(self, limit: int = PROBE_MAX_PATHS, explore: int = PROBE_EXPLORE_SLOTS) -> List[str]:
+        # Paths that have hit are ranked by hits, leaving `explore` slots free. Those and any
+        # other free slots go to the least-probed paths in default order, so paths past the
+        # limit are rotated in instead of never being tried.
+        with self._lock:
+            index = {path: i for i, path in enumerate(self.paths)}
+            proven = sorted((path for path in self.paths if self.hits[path]), key=lambda path: (-self.hits[path], index[path]))
+            proven = proven[:max(0, limit - explore)]
+            rest = sorted((path for path in self.paths if path not in proven), key=lambda path: (self.probes[path], index[path]))
+        return proven + rest[:limit - len(proven)]
+
+    def record(self, path: str, hit: bool):
+        with self._lock:
+            self.probes[path] += 1
+            if hit:
+                self.hits[path] += 1
+
+    def summary(self, top: int = 5) -> str:
+        with self._lock:
+            total_probes = sum(self.probes.values())
+            if not total_probes:
+                return "Known-path probing: no probes sent."
+            best = ", ".join(f"{path} {hits}/{self.probes[path]}" for path, hits in self.hits.most_common(top))
+        return f"Known-path probing: {sum(self.hits.values())} hits from {total_probes} probes. Top paths: {best or 'none'}"
+
+
+path_hit_stats = PathHitStats()
+
+
+def probe_url(base_url: str, path: str) -> str:
+    parsed = urlparse(base_url)
+    return urlunparse((parsed.scheme, parsed.netloc, path, '', '', ''))
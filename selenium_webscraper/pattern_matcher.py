@@ -0,0 +1,69 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _at_word_boundary(text: str, index: int) -> bool:
+    # Same rule as regex \b: a word character on exactly one side.
+    left = index > 0 and _is_word_char(text[index - 1])
+    right = index < len(text) and _is_word_char(text[index])
+    return left != right
+
+
+def _trie_regex(terms: Iterable[str]) -> str:
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional tails make the regex prefer the longest term at each position.
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class MultiPatternMatcher:
+    def __init__(self, categories: Dict[str, Tuple[Iterable[str], bool]]):
+        # categories maps a name to (terms, whole_word). Terms are matched as lowercase
+        # substrings; whole_word terms additionally need \b on both ends, like the
+        # r'\b' + re.escape(kw) + r'\b' patterns this replaces.
+        self.categories = list(categories)
+        self._term_categories: Dict[str, List[Tuple[str, bool]]] = {}
+        for category, (terms, whole_word) in categories.items():
+            for term in {t.lower() for t in terms if t}:
+                self._term_categories.setdefault(term, []).append((category, whole_word))
+
+        terms = sorted(self._term_categories)
+        # Every term occurring at a position is a prefix of the longest term found there,
+        # so each longest match expands to all (length, category, whole_word) hits at once.
+        self._expansions = {
+            term: [(len(prefix), category, whole_word)
+                   for prefix in terms if term.startswith(prefix)
+                   for category, whole_word in self._term_categories[prefix]]
+            for term in terms
+        }
+        self._pattern = re.compile('(?=(' + _trie_regex(terms) + '))') if terms else None
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.categories, 0)
+        if not self._pattern or not text:
+            return counts
+
+        expansions = self._expansions
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            for length, category, whole_word in expansions[match.group(1)]:
+                if whole_word and not (_at_word_boundary(text, start) and _at_word_boundary(text, start + length)):
+                    continue
+                counts[category] += 1
+        return counts
@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import RESULTS_JOURNAL_PATH
+
+
+class ResultsJournal:
+    def __init__(self, path: Path = RESULTS_JOURNAL_PATH):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        records = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line can be cut short if the previous run was killed mid-write.
+                    print(f"Skipping unreadable journal line {line_num} in {self.path.name}")
+                    continue
+                records[record['_id']] = record
+        return records
+
+    def open(self, resume: bool):
+        if not resume and self.path.exists() and self.path.stat().st_size > 0:
+            archived = self.path.with_name(f"{self.path.stem}.{time.strftime('%Y%m%d_%H%M%S')}{self.path.suffix}")
+            self.path.rename(archived)
+            print(f"Archived previous journal to {archived.name}")
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def append(self, record: Dict[str, Any]):
+        record = dict(record, journaled_at=time.time())
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def apply_journal_record(business, record: Dict[str, Any]):
+    if record.get('scraped_content'):
+        business.combined_text = record['scraped_content']
+    business.selenium_status = record.get('selenium_status')
+    business.selenium_scraped_content_length = record.get('selenium_scraped_content_length', 0)
+    business.selenium_debug_info = record.get('selenium_debug_info')
+    business.selenium_shared_from = record.get('shared_from')
+
+
+def journal_record_for(business, fetch_tier: Optional[str] = None, scraped_content: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        '_id': business._id,
+        'selenium_status': business.selenium_status,
+        'selenium_scraped_content_length': business.selenium_scraped_content_length,
+        'selenium_debug_info': business.selenium_debug_info,
+        'scraped_content': scraped_content,
+        'fetch_tier': fetch_tier,
+        'shared_from': getattr(business, 'selenium_shared_from', None)
+    }
@@ -0,0 +1,176 @@
+import logging
+import logging.handlers
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+from config import DEBUG_LOG_VERBOSITY, DEBUG_SIDECAR_MAX_BYTES, DEBUG_SIDECAR_BACKUP_COUNT
+
+DETAIL = 10
+INFO = 20
+WARNING = 30
+LEVELS = {"detail": DETAIL, "info": INFO, "warning": WARNING}
+
+MAX_FIELD_CHARS = 200
+
+
+class Event(IntEnum):
+    # Codes are stored in results and journals; never renumber, only append.
+    SCRAPE_STARTED = 1
+    SCRAPE_FINISHED = 2
+    URL_NORMALIZED = 3
+    URL_INVALID = 4
+    HTTP_UNAVAILABLE = 5
+    DRIVER_SETUP = 6
+    DRIVER_START_FAILED = 7
+    DRIVER_RESET = 8
+    DRIVER_QUIT = 9
+    WORKER_RECYCLE = 10
+    BROWSER_LOST = 11
+    WORKER_FAILED = 12
+    PROCESS_TIMEOUT = 13
+    NAVIGATING = 14
+    PAGE_LOADED = 15
+    PAGE_NOT_COMPLETE = 16
+    LOAD_TIMEOUT = 17
+    LOAD_ERROR = 18
+    PAGE_SOURCE = 19
+    SCRAPE_EXCEPTION = 20
+    CONTENT_EXTRACTED = 21
+    EXTRACT_FAILED = 22
+    NO_BODY = 23
+    CONTENT_ENOUGH = 24
+    CONTENT_TOO_SHORT = 25
+    JS_SHELL = 26
+    LINK_SEARCH = 27
+    LINK_SEARCH_FAILED = 28
+    NO_ABOUT_LINK = 29
+    CANDIDATES_SELECTED = 30
+    CANDIDATE_FETCH = 31
+    CANDIDATE_SCORED = 32
+    CANDIDATE_ACCEPTED = 33
+    BUDGET_EXHAUSTED = 34
+    FOLLOWED_SUCCESS = 35
+    FOLLOWED_TOO_SHORT = 36
+    DIRECT_PATH_SUCCESS = 37
+    ESCALATE_BROWSER = 38
+    PROBE_SOFT_404 = 39
+    CACHE_HIT = 40
+    CACHE_REVALIDATED = 41
+    HTTP_ERROR = 42
+    NON_HTML = 43
+    RESPONSE_TRUNCATED = 44
+    FETCH_FAILED = 45
+    SKIPPED = 46
+    KEPT_PREVIOUS = 47
+    BROWSER_CACHE_HIT = 48
+    SHARED_RESULT = 49
+    PIPELINE_ERROR = 50
+    CONFIRM_CHECK = 51
+    PAGE_UNCHANGED = 52
+    PAGE_CHANGED = 53
+    CONTENT_IDENTICAL = 54
+    RETRIED = 55
+
+
+DETAIL_EVENTS = {
+    Event.URL_NORMALIZED, Event.DRIVER_SETUP, Event.DRIVER_RESET, Event.DRIVER_QUIT, Event.NAVIGATING,
+    Event.PAGE_SOURCE, Event.LINK_SEARCH, Event.CANDIDATE_FETCH, Event.PROBE_SOFT_404, Event.CACHE_HIT,
+    Event.CACHE_REVALIDATED, Event.CONFIRM_CHECK,
+}
+WARNING_EVENTS = {
+    Event.URL_INVALID, Event.HTTP_UNAVAILABLE, Event.DRIVER_START_FAILED, Event.BROWSER_LOST, Event.WORKER_FAILED,
+    Event.PROCESS_TIMEOUT, Event.LOAD_TIMEOUT, Event.LOAD_ERROR, Event.SCRAPE_EXCEPTION, Event.EXTRACT_FAILED,
+    Event.NO_BODY, Event.LINK_SEARCH_FAILED, Event.BUDGET_EXHAUSTED, Event.FETCH_FAILED, Event.PIPELINE_ERROR,
+}
+
+
+def event_level(code: int) -> int:
+    if code in DETAIL_EVENTS:
+        return DETAIL
+    if code in WARNING_EVENTS:
+        return WARNING
+    return INFO
+
+
+def _compact(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_compact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+    # Exception text from WebDriver carries a whole stack trace; the first line says enough.
+    text = str(value).strip().split('\n', 1)[0]
+    return text if len(text) <= MAX_FIELD_CHARS else text[:MAX_FIELD_CHARS] + "..."
+
+
+def event_record(event: Event, **fields) -> list:
+    fields = {key: _compact(value) for key, value in fields.items() if value is not None}
+    return [int(event), fields] if fields else [int(event)]
+
+
+_capture_level = LEVELS[DEBUG_LOG_VERBOSITY]
+
+
+def set_capture_level(level: int):
+    global _capture_level
+    _capture_level = level
+
+
+def get_capture_level() -> int:
+    return _capture_level
+
+
+class ScrapeLog:
+    # Event records for one scrape, each [code] or [code, {field: value}]. Events
+    # below the capture level are dropped where they happen, so they never cross
+    # the worker pipe or reach the results.
+    def __init__(self, level: Optional[int] = None):
+        self.level = _capture_level if level is None else level
+        self.records: List[list] = []
+
+    def event(self, event: Event, **fields):
+        if event_level(event) >= self.level:
+            self.records.append(event_record(event, **fields))
+
+    def extend(self, records: Iterable[list]):
+        self.records.extend(records)
+
+
+def keep_records(records: Optional[List], level: int) -> List:
+    return [record for record in records or [] if isinstance(record, str) or event_level(record[0]) >= level]
+
+
+def describe(record) -> str:
+    # Older results hold free-text messages; they are shown as they are.
+    if isinstance(record, str):
+        return record
+    try:
+        name = Event(record[0]).name.lower()
+    except ValueError:
+        name = f"event_{record[0]}"
+    if len(record) < 2:
+        return name
+    return name + ": " + ", ".join(f"{key}={value}" for key, value in record[1].items())
+
+
+class EventSidecar:
+    # Every captured event, rendered as text, in a size-rotated file next to the results.
+    def __init__(self, path: Path, max_bytes: int = DEBUG_SIDECAR_MAX_BYTES,
+                 backup_count: int = DEBUG_SIDECAR_BACKUP_COUNT):
+        self._handler = logging.handlers.RotatingFileHandler(str(path), maxBytes=max_bytes, backupCount=backup_count,
+                                                             encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self._logger = logging.getLogger(f"scrape_events.{path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+
+    def write(self, business_id: str, records: Optional[List]):
+        for record in records or []:
+            self._logger.info("%s\t%s", business_id, describe(record))
+
+    def close(self):
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from config import (
+    MAX_CONCURRENT_SCRAPES, PER_HOST_MAX_CONCURRENCY, PER_HOST_DELAY_SECONDS,
+    THROUGHPUT_REPORT_INTERVAL_SECONDS, MAX_RETRIES, INITIAL_RETRY_DELAY,
+    HOST_CIRCUIT_BREAKER_THRESHOLD, HOST_CIRCUIT_BREAKER_COOLDOWN_SECONDS
+)
+from scrape_events import Event, event_record
+from scrape_state import is_retryable_status, is_permanent_error
+
+FRESH_PRIORITY = 0
+RETRY_PRIORITY = 1
+
+
+def host_key(url: Optional[str]) -> str:
+    if not url:
+        return ""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    host = urlparse(url).netloc.lower().split('@')[-1].split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+
+# Second-level labels that country domains register under ("example.co.uk").
+_SECOND_LEVEL_SUFFIXES = {"co", "com", "net", "org", "gov", "edu", "ac", "or", "ne", "go", "gob", "nom", "ltd", "plc"}
+
+
+def site_key(url: Optional[str]) -> str:
+    # Roughly the registrable domain, without a public-suffix list. Sites on one
+    # platform (x.wixsite.com, y.wixsite.com) share a key.
+    host = host_key(url)
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit():
+        return host
+    keep = 3 if labels[-2] in _SECOND_LEVEL_SUFFIXES and len(labels[-1]) == 2 else 2
+    return '.'.join(labels[-keep:])
+
+
+class HostThrottle:
+    def __init__(self, max_concurrency: int = PER_HOST_MAX_CONCURRENCY, delay_seconds: float = PER_HOST_DELAY_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.delay_seconds = delay_seconds
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.max_concurrency))
+        self._next_allowed: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def acquire(self, host: str):
+        await self._semaphores[host].acquire()
+        # Space out request starts on the same host; different hosts never wait on each other.
+        async with self._locks[host]:
+            now = time.monotonic()
+            wait_for = self._next_allowed.get(host, now) - now
+            if wait_for > 0:
+                await asyncio.sleep(wait_for)
+            self._next_allowed[host] = time.monotonic() + self.delay_seconds
+
+    def release(self, host: str):
+        self._semaphores[host].release()
+
+
+class HostCircuitOpen(Exception):
+    def __init__(self, host: str, failures: int):
+        super().__init__(f"Circuit open for {host} after {failures} consecutive failures")
+        self.host = host
+
+
+class PrioritySlots:
+    # A semaphore that hands freed slots to the lowest priority value first (FIFO
+    # within a priority), so queued retries only run when no fresh work is waiting.
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: int = FRESH_PRIORITY):
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free += 1
+
+
+class HostCircuitBreaker:
+    # After `threshold` consecutive retryable failures a site (see site_key) gets no
+    # new attempts until the cooldown has passed; the next attempt then closes or
+    # re-opens it. Hosts are unique after domain grouping, so counting per site is
+    # what lets failures on one business stop attempts on another.
+    def __init__(self, threshold: int = HOST_CIRCUIT_BREAKER_THRESHOLD,
+                 cooldown_seconds: float = HOST_CIRCUIT_BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures: Dict[str, int] = defaultdict(int)
+        self._open_until: Dict[str, float] = {}
+        self.trips = 0
+
+    def allow(self, host: str) -> bool:
+        return time.monotonic() >= self._open_until.get(host, 0)
+
+    def record(self, host: str, failed: bool):
+        if not failed:
+            self.failures.pop(host, None)
+            self._open_until.pop(host, None)
+            return
+        self.failures[host] += 1
+        if self.failures[host] >= self.threshold:
+            self._open_until[host] = time.monotonic() + self.cooldown_seconds
+            self.trips += 1
+
+
+def retry_delay(attempt: int, initial_delay: float = INITIAL_RETRY_DELAY) -> float:
+    # Exponential backoff with jitter over the upper half, so retries of hosts that
+    # failed together do not come back in lockstep.
+    delay = initial_delay * 2 ** attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_retryable_result(result: Optional[Dict[str, Any]], error: Optional[BaseException]) -> bool:
+    if error is not None:
+        return not isinstance(error, HostCircuitOpen)
+    return is_retryable_status(result.get('status')) and not is_permanent_error(result.get('error'))
+
+
+class ThroughputMeter:
+    def __init__(self, total: int, window_seconds: float = 300):
+        self.total = total
+        self.window_seconds = window_seconds
+        self.completed = 0
+        self.start_time = time.monotonic()
+        self._recent = deque()
+
+    def record(self):
+        now = time.monotonic()
+        self.completed += 1
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > self.window_seconds:
+            self._recent.popleft()
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.start_time
+        overall_rate = self.completed / elapsed * 60 if elapsed > 0 else 0.0
+        window = min(elapsed, self.window_seconds)
+        recent_rate = len(self._recent) / window * 60 if window > 0 else 0.0
+        remaining = self.total - self.completed
+        eta = f"{remaining / recent_rate:.1f} min" if recent_rate > 0 else "unknown"
+        return (f"Progress: {self.completed}/{self.total} | {overall_rate:.1f} businesses/min overall, "
+                f"{recent_rate:.1f} businesses/min recent | ETA: {eta}")
+
+
+class ScrapeScheduler:
+    def __init__(self, scrape_fn: Callable[[Any], Awaitable[Dict[str, Any]]],
+                 max_concurrency: int = MAX_CONCURRENT_SCRAPES,
+                 host_throttle: Optional[HostThrottle] = None,
+                 report_interval: float = THROUGHPUT_REPORT_INTERVAL_SECONDS,
+                 max_retries: int = MAX_RETRIES,
+                 circuit_breaker: Optional[HostCircuitBreaker] = None):
+        self.scrape_fn = scrape_fn
+        self.max_concurrency = max_concurrency
+        self.host_throttle = host_throttle or HostThrottle()
+        self.report_interval = report_interval
+        self.max_retries = max_retries
+        self.circuit_breaker = circuit_breaker or HostCircuitBreaker()
+        self.meter: Optional[ThroughputMeter] = None
+        self.retries = 0
+        self.recovered = 0
+
+    async def run(self, businesses: Iterable[Any],
+                  on_result: Callable[[Any, Optional[Dict[str, Any]], Optional[BaseException]], None]):
+        businesses = list(businesses)
+        self.meter = ThroughputMeter(len(businesses))
+        global_slots = PrioritySlots(self.max_concurrency)
+
+        async def attempt(business, host, site, priority):
+            # The global slot comes first, so a retry queued behind fresh work does not
+            # hold its host's slot meanwhile.
+            await global_slots.acquire(priority)
+            try:
+                await self.host_throttle.acquire(host)
+                try:
+                    if not self.circuit_breaker.allow(site):
+                        return None, HostCircuitOpen(site, self.circuit_breaker.failures[site])
+                    try:
+                        return await self.scrape_fn(business), None
+                    except Exception as e:
+                        return None, e
+                finally:
+                    self.host_throttle.release(host)
+            finally:
+                global_slots.release()
+
+        async def run_one(business):
+            host = host_key(business.web_url)
+            site = site_key(business.web_url)
+            history = []
+            failed = True
+            while True:
+                result, error = await attempt(business, host, site, RETRY_PRIORITY if history else FRESH_PRIORITY)
+                if isinstance(error, HostCircuitOpen):
+                    if history:
+                        # Report the last real failure rather than the skipped retry.
+                        result, error = last_result, last_error
+                        history.pop()
+                        self.retries -= 1
+                    break
+                failed = is_retryable_result(result, error)
+                self.circuit_breaker.record(site, failed)
+                if not failed or len(history) >= self.max_retries or not self.circuit_breaker.allow(site):
+                    break
+                last_result, last_error = result, error
+                history.append(f"error: {error}" if error is not None else result.get('status'))
+                self.retries += 1
+                # Back off without holding a slot; other work runs meanwhile.
+                await asyncio.sleep(retry_delay(len(history) - 1))
+
+            if history:
+                if not failed:
+                    self.recovered += 1
+                if result is not None and 'debug_log' in result:
+                    result['debug_log'] = [event_record(Event.RETRIED, attempt=len(history) + 1, earlier=history)] \
+                        + result['debug_log']
+            on_result(business, result, error)
+            self.meter.record()
+
+        reporter = asyncio.create_task(self._report_progress())
+        try:
+            await asyncio.gather(*(run_one(b) for b in businesses))
+        finally:
+            reporter.cancel()
+        print(self.meter.summary())
+        print(f"Retries: {self.retries} scheduled, {self.recovered} businesses recovered; "
+              f"site circuit breaker tripped {self.circuit_breaker.trips} times.")
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            print(f"\n--- {self.meter.summary()} ---")
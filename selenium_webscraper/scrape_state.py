@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from config import SCRAPE_STATE_PATH, RETRYABLE_STATUS_PREFIXES, PERMANENT_ERROR_MARKERS
+from page_cache import content_digest
+from scrape_events import Event, event_record
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_state (
+    _id TEXT PRIMARY KEY,
+    web_url TEXT,
+    final_url TEXT,
+    status TEXT,
+    content_hash TEXT,
+    page_hash TEXT,
+    content BLOB,
+    scraped_at REAL NOT NULL
+);
+"""
+
+
+def is_retryable_status(status: Optional[str]) -> bool:
+    return bool(status) and status.startswith(tuple(RETRYABLE_STATUS_PREFIXES))
+
+
+def is_permanent_error(error: Optional[str]) -> bool:
+    return bool(error) and any(marker in error for marker in PERMANENT_ERROR_MARKERS)
+
+
+@dataclass
+class ScrapeState:
+    _id: str
+    web_url: Optional[str]
+    final_url: Optional[str]
+    status: Optional[str]
+    content_hash: Optional[str]
+    page_hash: Optional[str]
+    content: Optional[str]
+    scraped_at: float
+
+    def age_seconds(self) -> float:
+        return time.time() - self.scraped_at
+
+
+def apply_scrape_state(business, state: ScrapeState):
+    if state.content:
+        business.combined_text = state.content
+    business.selenium_status = state.status
+    business.selenium_scraped_content_length = len(state.content) if state.content else 0
+    business.selenium_debug_info = [
+        event_record(Event.KEPT_PREVIOUS, scraped=time.strftime('%Y-%m-%d %H:%M', time.localtime(state.scraped_at)))]
+
+
+class ScrapeStateStore:
+    # Last outcome per business _id, kept across runs so an incremental run only
+    # queues new, stale or retryable records. page_hash is the sha256 of the HTML
+    # the content came from, used to confirm a stale page is unchanged.
+    def __init__(self, path: Path = SCRAPE_STATE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, _id: str) -> Optional[ScrapeState]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT _id, web_url, final_url, status, content_hash, page_hash, content, scraped_at "
+                "FROM scrape_state WHERE _id = ?", (_id,)).fetchone()
+        if row is None:
+            return None
+        content = zlib.decompress(row[6]).decode('utf-8') if row[6] is not None else None
+        return ScrapeState(*row[:6], content, row[7])
+
+    def record(self, _id: str, web_url: Optional[str], final_url: Optional[str], status: Optional[str],
+               content: Optional[str], page_hash: Optional[str] = None, scraped_at: Optional[float] = None):
+        blob = zlib.compress(content.encode('utf-8')) if content else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scrape_state (_id, web_url, final_url, status, content_hash, page_hash, "
+                "content, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (_id, web_url, final_url, status, content_digest(content) if content else None, page_hash, blob,
+                 scraped_at if scraped_at is not None else time.time()))
+            self._db.commit()
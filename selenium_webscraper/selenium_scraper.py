@@ -1,31 +1,34 @@
-import time
-import re
+import json
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
+from selenium.webdriver.common.timeouts import Timeouts
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
-from typing import Optional, Dict, Any, List
-from urllib.parse import urlparse, urlunparse
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from typing import Optional, Dict, Any, List, Tuple
 import multiprocessing
-import sys
 from pathlib import Path
 
 from config import (
-    PHRASES, KEYWORDS, ABOUT_URL_KEYWORDS, ABOUT_LINK_TEXT_PATTERNS,
-    ABOUT_SECTION_SELECTORS, NAV_SELECTORS,
-    SELENIUM_TIMEOUT, PAGE_LOAD_TIMEOUT, IMPLICIT_WAIT,
-    MIN_CONTENT_LENGTH, MAX_ABOUT_PATHS, PROCESS_TIMEOUT_SECONDS,IRRELEVANT_KEYWORDS
+    ABOUT_SECTION_SELECTORS, NAV_SELECTORS, HIDDEN_SELECTORS, IMPLICIT_WAIT, WORKER_KILL_GRACE_SECONDS,
+    MIN_CONTENT_LENGTH, MAX_HARVESTED_LINKS, SCRAPE_PROFILE, LEAN_BLOCKED_URL_PATTERNS, PAGE_LOAD_STATS,
+    TAB_SCRIPT_TIMEOUT_SECONDS, TAB_COOKIE_CLEAR_JOBS
 )
+from about_links import normalize_url, select_about_candidates
+from about_crawl import AboutCrawl
+from stage_budget import ScrapeBudget, budget_seconds, default_stage_timeouts
+from span_timing import SpanRecorder
+from scrape_events import Event, ScrapeLog, DETAIL, MAX_FIELD_CHARS, describe
+from shared_text import new_segment_name, put_text, take_text, discard_text
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("BeautifulSoup not found. Please install it: pip install beautifulsoup4", file=sys.stderr)
-    BeautifulSoup = None
+_page_load_stats_enabled = PAGE_LOAD_STATS
 
-def setup_driver():
+
+def set_page_load_stats_enabled(enabled: bool):
+    global _page_load_stats_enabled
+    _page_load_stats_enabled = enabled
+
+
+def setup_driver(profile: str = SCRAPE_PROFILE, tabbed: bool = False):
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -35,272 +38,668 @@ def setup_driver():
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.page_load_strategy = 'normal'
+    if profile == "lean":
+        # Return at DOMContentLoaded and never decode images; fonts, media and
+        # tracker scripts are blocked per tab in apply_profile.
+        options.page_load_strategy = 'eager'
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    else:
+        options.page_load_strategy = 'normal'
+    if tabbed:
+        # Commands must never wait on a loading tab; TabbedScraper polls readiness itself.
+        options.page_load_strategy = 'none'
+    if _page_load_stats_enabled and not tabbed:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
 
     return options
 
-def extract_content(driver, debug_log: List[str]) -> str:
-    debug_log.append("Attempting to extract content.")
-    content_elements = []
-    
-    for selector in ABOUT_SECTION_SELECTORS:
-        try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elements:
-                debug_log.append(f"Found elements with selector: {selector}")
-                content_elements.extend(elements)
-                break
-        except NoSuchElementException:
-            continue
-
-    if not content_elements:
-        try:
-            body_element = driver.find_element(By.TAG_NAME, "body")
-            content_elements = [body_element]
-            debug_log.append("No specific about section found, extracting from body.")
-        except NoSuchElementException:
-            debug_log.append("Could not find body element.")
-            return ""
-
-    full_text = ""
-    for element in content_elements:
-        try:
-            text = element.get_attribute('innerText')
-            if text:
-                full_text += text + "\n"
-        except Exception as e:
-            debug_log.append(f"Error getting text from element: {e}")
-            
-    if BeautifulSoup:
-        soup = BeautifulSoup(full_text, 'html.parser')
-        for selector in NAV_SELECTORS:
-            for tag in soup.select(selector):
-                tag.extract()
-
-        cleaned_text = soup.get_text(separator=' ', strip=True)
-        debug_log.append(f"Extracted {len(cleaned_text)} characters of content.")
-        return cleaned_text
-    else:
-        debug_log.append("BeautifulSoup not available, returning raw text.")
-        return full_text.strip()
-
-def normalize_url(url: str, debug_log: List[str]) -> str:
-    original_url = url
-    debug_log.append(f"Normalizing URL: {original_url}")
+def apply_profile(driver, profile: str = SCRAPE_PROFILE):
+    if profile == "lean":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URL_PATTERNS})
+
+PAGE_READY_SCRIPT = """
+if (document.readyState === 'complete') return true;
+if (!arguments[0] || document.readyState === 'loading' || !document.body) return false;
+return document.body.innerText.length >= arguments[1];
+"""
+
+def apply_stage_timeouts(driver, budget: ScrapeBudget):
+    # One call bounds both driver.get and execute_script by what is left of the stage.
+    if budget.expired():
+        raise TimeoutException("Scrape budget exhausted")
+    remaining = budget.remaining()
+    driver.timeouts = Timeouts(implicit_wait=IMPLICIT_WAIT, page_load=remaining, script=remaining)
+
+def wait_for_page(driver, profile: str, debug_log: ScrapeLog, timeout: float):
+    lean = profile == "lean"
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script(PAGE_READY_SCRIPT, lean, MIN_CONTENT_LENGTH)
+        )
+    except TimeoutException:
+        # The lean profile only needs readable text: a parsed DOM that never
+        # reaches "complete" (long polling, slow trackers) is still usable.
+        if not lean or driver.execute_script("return document.readyState") == "loading":
+            raise
+        debug_log.event(Event.PAGE_NOT_COMPLETE)
+
+def new_page_load_stats() -> Dict[str, int]:
+    return {"requests": 0, "blocked_requests": 0, "bytes": 0}
+
+def collect_page_load_stats(driver, stats: Optional[Dict[str, int]]):
+    if not _page_load_stats_enabled:
+        return
+    try:
+        entries = driver.get_log('performance')
+    except WebDriverException:
+        return
+    if stats is None:
+        return
+    for entry in entries:
+        message = json.loads(entry['message']).get('message', {})
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            stats['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            stats['bytes'] += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and (
+                params.get('blockedReason') or 'BLOCKED_BY_CLIENT' in params.get('errorText', '')):
+            stats['blocked_requests'] += 1
+
+EXTRACT_CONTENT_SCRIPT = """
+const sectionSelectors = arguments[0];
+const stripSelectors = arguments[1];
+const minLength = arguments[2];
+const hiddenSelectors = arguments[3];
+if (!document.body) {
+    return null;
+}
+// Computed style is only available on the live page, so hidden elements are marked
+// there, dropped from the clone below and unmarked again. Their subtrees are skipped.
+const hiddenMark = 'data-scrape-hidden';
+const hidden = [];
+const isHidden = el => {
+    if (hiddenSelectors.some(selector => { try { return el.matches(selector); } catch (e) { return false; } })) {
+        return true;
+    }
+    const style = getComputedStyle(el);
+    return style.display === 'none' || style.visibility === 'hidden';
+};
+document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT, {
+    acceptNode: el => isHidden(el) ? (hidden.push(el), NodeFilter.FILTER_REJECT) : NodeFilter.FILTER_SKIP
+}).nextNode();
+hidden.forEach(el => el.setAttribute(hiddenMark, ''));
+// Work on a detached clone so nav/header/footer can be dropped without touching the live page.
+const root = document.body.cloneNode(true);
+hidden.forEach(el => el.removeAttribute(hiddenMark));
+let removed = 0;
+root.querySelectorAll('[' + hiddenMark + ']').forEach(node => { node.remove(); removed++; });
+for (const selector of stripSelectors) {
+    try {
+        root.querySelectorAll(selector).forEach(node => { node.remove(); removed++; });
+    } catch (e) {}
+}
+const textOf = element => {
+    const parts = [];
+    const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const part = node.nodeValue.trim();
+        if (part) parts.push(part);
+    }
+    return parts.join(' ');
+};
+const stats = {};
+let best = null;
+for (const selector of sectionSelectors) {
+    let matches = [];
+    try {
+        matches = Array.from(root.querySelectorAll(selector));
+    } catch (e) {}
+    // Nested matches would repeat their text, so keep only the outermost ones.
+    matches = matches.filter(el => !matches.some(other => other !== el && other.contains(el)));
+    const text = matches.map(textOf).filter(Boolean).join(' ');
+    stats[selector] = [matches.length, text.length];
+    if (matches.length && (best === null || (best.text.length < minLength && text.length > best.text.length))) {
+        best = {selector: selector, text: text};
+    }
+}
+if (best === null || best.text.length < minLength) {
+    const bodyText = textOf(root);
+    if (best === null || bodyText.length > best.text.length) {
+        best = {selector: 'body', text: bodyText};
+    }
+}
+return {text: best.text, selector: best.selector, stats: stats, removed: removed};
+"""
 
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-        debug_log.append(f"Added HTTPS scheme: {url}")
+STRIPPED_SELECTORS = NAV_SELECTORS + ["script", "style", "noscript", "template"]
 
-    parsed_url = urlparse(url)
-    
-    if not parsed_url.netloc:
-        debug_log.append(f"Invalid URL after scheme addition (no netloc): {url}")
+def extract_content(driver, debug_log: ScrapeLog) -> str:
+    try:
+        result = driver.execute_script(EXTRACT_CONTENT_SCRIPT, ABOUT_SECTION_SELECTORS, STRIPPED_SELECTORS, MIN_CONTENT_LENGTH,
+                                       HIDDEN_SELECTORS)
+    except WebDriverException as e:
+        debug_log.event(Event.EXTRACT_FAILED, error=e)
+        return ""
+    if not result:
+        debug_log.event(Event.NO_BODY)
         return ""
 
-    cleaned_url = urlunparse(parsed_url._replace(fragment='', query=''))
-    debug_log.append(f"Cleaned URL (removed fragment/query): {cleaned_url}")
-    return cleaned_url
+    # matches maps each matching selector to [element count, chars].
+    matched = {selector: counts for selector, counts in result['stats'].items() if counts[0]}
+    debug_log.event(Event.CONTENT_EXTRACTED, chars=len(result['text']), selector=result['selector'],
+                    removed=result['removed'], matches=matched)
+    return result['text']
+
+HARVEST_LINKS_SCRIPT = """
+const limit = arguments[0];
+const anchors = document.querySelectorAll('a[href]');
+const links = [];
+for (let i = 0; i < anchors.length && links.length < limit; i++) {
+    const a = anchors[i];
+    links.push([a.href, (a.innerText || a.textContent || '').trim().slice(0, 200)]);
+}
+return links;
+"""
+
+def find_about_candidates(driver, initial_url: str, current_url: str, debug_log: ScrapeLog) -> List[str]:
+    debug_log.event(Event.LINK_SEARCH, url=current_url)
 
-def find_about_page_path(driver, initial_url: str, debug_log: List[str]) -> Optional[str]:
-    debug_log.append(f"Searching for 'about' links on {driver.current_url}")
-    
-    potential_links = []
-    
     try:
-        links = driver.find_elements(By.TAG_NAME, 'a')
-        for link in links:
-            href = link.get_attribute('href')
-            link_text = link.text.strip()
-            
-            if not href:
-                continue
-
-            normalized_href = normalize_url(href, debug_log)
-            if not normalized_href:
-                continue
-            
-            is_internal = urlparse(normalized_href).netloc == urlparse(initial_url).netloc
-
-            if any(kw in normalized_href.lower() for kw in ABOUT_URL_KEYWORDS) or \
-               any(pattern.search(link_text) for pattern in ABOUT_LINK_TEXT_PATTERNS):
-                
-                parsed_href = urlparse(normalized_href)
-                path_segments = parsed_href.path.lower().split('/')
-                if not any(kw in path_segments for kw in IRRELEVANT_KEYWORDS):
-                    potential_links.append((normalized_href, is_internal))
-                    if any(pattern.search(link_text) for pattern in ABOUT_LINK_TEXT_PATTERNS):
-                        debug_log.append(f"Found strong 'about' link by text: {link_text} -> {href}")
-                        return normalized_href
-                    elif any(kw in normalized_href.lower() for kw in ABOUT_URL_KEYWORDS):
-                         debug_log.append(f"Found strong 'about' link by URL keyword: {href}")
-                         return normalized_href
-
+        # One round trip for every anchor instead of two WebDriver calls per link.
+        anchors = driver.execute_script(HARVEST_LINKS_SCRIPT, MAX_HARVESTED_LINKS) or []
     except Exception as e:
-        debug_log.append(f"Error while finding about page links: {e}")
-        return None
-
-    if potential_links:
-        internal_links = [link for link, is_internal in potential_links if is_internal]
-        external_links = [link for link, is_internal in potential_links if not is_internal]
-
-        if internal_links:
-            debug_log.append(f"Selected internal 'about' link: {internal_links[0]}")
-            return internal_links[0]
-        elif external_links:
-            debug_log.append(f"Selected external 'about' link (as no internal found): {external_links[0]}")
-            return external_links[0]
-    
-    debug_log.append("No suitable 'about' link found.")
-    return None
-
-def _scrape_process(business_id: str, url: str, return_dict: dict):
-    driver = None
-    service = None
+        debug_log.event(Event.LINK_SEARCH_FAILED, error=e)
+        return []
+
+    return select_about_candidates(anchors, initial_url, current_url, debug_log)
+
+def follow_about_candidates(driver, crawl: AboutCrawl, budget: ScrapeBudget, profile: str, debug_log: ScrapeLog):
+    # Candidates are tried best-ranked first until one clears the good-scrape
+    # threshold or the business's budget runs out.
+    while not crawl.done:
+        about_url = crawl.next_candidate()
+        if about_url is None:
+            break
+        if budget.exhausted():
+            debug_log.event(Event.BUDGET_EXHAUSTED, position=crawl.position, total=crawl.total)
+            break
+        debug_log.event(Event.CANDIDATE_FETCH, kind="browser", position=crawl.position, total=crawl.total, url=about_url)
+        try:
+            with budget.stage("follow_load"):
+                apply_stage_timeouts(driver, budget)
+                with budget.spans.span("follow_load/get"):
+                    driver.get(about_url)
+                with budget.spans.span("follow_load/ready_wait"):
+                    wait_for_page(driver, profile, debug_log, budget.remaining())
+            final_url = driver.current_url
+            debug_log.event(Event.PAGE_LOADED, url=final_url)
+            with budget.stage("extract"):
+                apply_stage_timeouts(driver, budget)
+                content = extract_content(driver, debug_log)
+        except TimeoutException:
+            crawl.fail("failed_timeout_followed_link")
+            debug_log.event(Event.LOAD_TIMEOUT, url=about_url, stage="follow_load")
+            continue
+        except WebDriverException as e:
+            crawl.fail("failed_webdriver_followed_link")
+            debug_log.event(Event.LOAD_ERROR, url=about_url, error=e)
+            continue
+        except Exception as e:
+            crawl.fail("failed_exception_followed_link")
+            debug_log.event(Event.SCRAPE_EXCEPTION, url=about_url, error=e)
+            continue
+        crawl.offer(final_url, content)
+
+def create_driver(log_name: str, profile: str = SCRAPE_PROFILE, tabbed: bool = False):
+    service = ChromeService(log_path=str(Path(f"chromedriver_log_{log_name}.txt")))
+    driver_options = setup_driver(profile, tabbed)
+    driver = webdriver.Chrome(service=service, options=driver_options)
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    if tabbed:
+        # Bounds every call into a tab whose renderer has hung.
+        driver.set_script_timeout(TAB_SCRIPT_TIMEOUT_SECONDS)
+    apply_profile(driver, profile)
+    return driver, service
+
+def reset_driver(driver, debug_log: ScrapeLog):
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        pass
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.get("about:blank")
+    debug_log.event(Event.DRIVER_RESET, closed_tabs=len(handles) - 1)
+
+def quit_driver(driver, service, debug_log: ScrapeLog):
+    driver_error = service_error = None
+    if driver:
+        try:
+            driver.quit()
+        except Exception as e:
+            driver_error = e
+    if service:
+        try:
+            service.stop()
+        except Exception as e:
+            service_error = e
+    debug_log.event(Event.DRIVER_QUIT, started=bool(driver or service), driver_error=driver_error,
+                    service_error=service_error)
+
+def scrape_with_driver(driver, url: str, debug_log: ScrapeLog, profile: str = SCRAPE_PROFILE,
+                       stage_timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     scraped_content = ""
     status = "failed_unknown"
+    error = None
     final_url_attempted = url
-    debug_log = [f"Starting scrape process for ID: {business_id}, URL: {url}"]
-
-    chromedriver_log_path = Path(f"chromedriver_log_{business_id}.txt")
+    page_load_stats = new_page_load_stats()
+    budget = ScrapeBudget(stage_timeouts, timeout_errors=(TimeoutException,))
+    collect_page_load_stats(driver, None)
 
     try:
-        debug_log.append("Setting up WebDriver.")
-        service = ChromeService(log_path=str(chromedriver_log_path))
-        driver_options = setup_driver()
-        driver = webdriver.Chrome(service=service, options=driver_options)
-        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-        driver.implicitly_wait(IMPLICIT_WAIT)
-        
-        normalized_initial_url = normalize_url(url, debug_log)
+        with budget.spans.span("normalize_url"):
+            normalized_initial_url = normalize_url(url, debug_log)
         if not normalized_initial_url:
             status = "failed_invalid_initial_url"
-            debug_log.append(f"Initial URL '{url}' normalized to an invalid format.")
-            return_dict['scraped_content'] = scraped_content
-            return_dict['status'] = status
-            return_dict['final_url_attempted'] = final_url_attempted
-            return_dict['debug_log'] = debug_log
-            return_dict['business_id'] = business_id # Ensure business_id is returned even on early exit
-            return
-
-        debug_log.append(f"Navigating to initial URL: {normalized_initial_url}")
-        driver.get(normalized_initial_url)
-        WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
-        debug_log.append(f"Page loaded: {driver.current_url}")
+            return {
+                'scraped_content': scraped_content,
+                'status': status,
+                'final_url_attempted': final_url_attempted,
+                'page_load_stats': page_load_stats,
+                'stage_timings': budget.timings,
+                'spans': budget.spans.spans
+            }
+
+        debug_log.event(Event.NAVIGATING, url=normalized_initial_url, budget=round(budget.total))
+        with budget.stage("initial_load"):
+            apply_stage_timeouts(driver, budget)
+            with budget.spans.span("initial_load/get"):
+                driver.get(normalized_initial_url)
+            with budget.spans.span("initial_load/ready_wait"):
+                wait_for_page(driver, profile, debug_log, budget.remaining())
         final_url_attempted = driver.current_url
+        debug_log.event(Event.PAGE_LOADED, url=final_url_attempted)
         status = "success_original_url"
 
-        initial_content = extract_content(driver, debug_log)
+        with budget.stage("extract"):
+            apply_stage_timeouts(driver, budget)
+            initial_content = extract_content(driver, debug_log)
         if len(initial_content) >= MIN_CONTENT_LENGTH:
             scraped_content = initial_content
             status = "success_content_found"
-            debug_log.append(f"Initial page has enough content ({len(initial_content)} chars).")
+            debug_log.event(Event.CONTENT_ENOUGH, chars=len(initial_content))
         else:
-            debug_log.append(f"Initial page content too short ({len(initial_content)} chars). Looking for about page.")
-            
-            about_url = find_about_page_path(driver, normalized_initial_url, debug_log)
-            if about_url and normalize_url(about_url, debug_log) != normalize_url(final_url_attempted, debug_log):
-                debug_log.append(f"Attempting to navigate to found 'about' URL: {about_url}")
-                try:
-                    driver.get(about_url)
-                    WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
-                        lambda d: d.execute_script("return document.readyState") == "complete"
-                    )
-                    debug_log.append(f"Navigated to about page: {driver.current_url}")
-                    final_url_attempted = driver.current_url
-                    scraped_content = extract_content(driver, debug_log)
-                    if len(scraped_content) >= MIN_CONTENT_LENGTH:
-                        status = "success_followed_link"
-                        debug_log.append(f"Successfully scraped content from followed link ({len(scraped_content)} chars).")
-                    else:
-                        status = "failed_content_too_short_followed"
-                        debug_log.append(f"Followed link content too short ({len(scraped_content)} chars).")
-                except TimeoutException:
-                    status = "failed_timeout_followed_link"
-                    debug_log.append(f"Timeout navigating to followed about link: {about_url}")
-                except WebDriverException as e:
-                    status = "failed_webdriver_followed_link"
-                    debug_log.append(f"WebDriver error navigating to followed about link: {e}")
-                    try:
-                        debug_log.append(f"Page source on WebDriver error: {driver.page_source[:500]}...")
-                    except Exception as ps_e:
-                        debug_log.append(f"Could not get page source on WebDriver error: {ps_e}")
-                except Exception as e:
-                    status = "failed_exception_followed_link"
-                    debug_log.append(f"General error navigating to followed about link: {e}")
+            debug_log.event(Event.CONTENT_TOO_SHORT, chars=len(initial_content), next="links")
+
+            with budget.stage("link_discovery"):
+                apply_stage_timeouts(driver, budget)
+                candidates = find_about_candidates(driver, normalized_initial_url, final_url_attempted, debug_log)
+            if candidates:
+                crawl = AboutCrawl(candidates, debug_log)
+                follow_about_candidates(driver, crawl, budget, profile, debug_log)
+                status, best_url, scraped_content = crawl.outcome("failed_content_too_short_followed")
+                final_url_attempted = best_url or final_url_attempted
+                if status == "success_followed_link":
+                    debug_log.event(Event.FOLLOWED_SUCCESS, chars=len(scraped_content))
+                elif status == "failed_content_too_short_followed":
+                    debug_log.event(Event.FOLLOWED_TOO_SHORT, chars=len(scraped_content))
             else:
                 status = "failed_no_about_link_found"
-                debug_log.append("No suitable 'about' link found or already on about page.")
 
     except TimeoutException:
         status = "failed_timeout_initial"
-        debug_log.append(f"Timeout while loading initial URL: {url}")
+        debug_log.event(Event.LOAD_TIMEOUT, url=url, stage="initial_load")
     except WebDriverException as e:
         status = "failed_webdriver_error_initial"
-        debug_log.append(f"WebDriver error for initial URL: {url} - {e}")
-        try:
-            debug_log.append(f"Page source on WebDriver error: {driver.page_source[:500]}...")
-        except Exception as ps_e:
-            debug_log.append(f"Could not get page source on WebDriver error: {ps_e}")
+        error = str(e.msg or e).strip().split('\n', 1)[0]
+        debug_log.event(Event.LOAD_ERROR, url=url, error=error)
+        if debug_log.level <= DETAIL:
+            try:
+                debug_log.event(Event.PAGE_SOURCE, source=driver.page_source[:MAX_FIELD_CHARS])
+            except Exception as ps_e:
+                debug_log.event(Event.PAGE_SOURCE, error=ps_e)
     except Exception as e:
         status = "failed_general_exception"
-        debug_log.append(f"General exception during scrape for URL: {url} - {e}")
-    finally:
-        if driver:
-            try:
-                debug_log.append("Quitting driver.")
-                driver.quit()
-                debug_log.append("Driver quit successfully.")
-            except Exception as e:
-                debug_log.append(f"Error quitting driver: {e}")
-        if service:
+        debug_log.event(Event.SCRAPE_EXCEPTION, url=url, error=e)
+
+    collect_page_load_stats(driver, page_load_stats)
+    return {
+        'scraped_content': scraped_content,
+        'status': status,
+        'error': error,
+        'final_url_attempted': final_url_attempted,
+        'page_load_stats': page_load_stats,
+        'stage_timings': budget.timings,
+        'spans': budget.spans.spans
+    }
+
+NAVIGATE_SCRIPT = """
+window.__scrapeNavigating = true;
+window.location.href = arguments[0];
+"""
+
+# The flag set by NAVIGATE_SCRIPT lives on the old document, so a tab only counts
+# as loaded once the new document has replaced it.
+TAB_STATE_SCRIPT = """
+const state = {started: !window.__scrapeNavigating, url: location.href, readyState: document.readyState, ready: false};
+if (!state.started) return state;
+state.ready = document.readyState === 'complete';
+if (location.protocol === 'chrome-error:') {
+    const code = document.querySelector('.error-code');
+    state.error = code ? code.textContent.trim() : '';
+}
+if (!state.ready && arguments[0] && document.readyState !== 'loading' && document.body) {
+    state.ready = document.body.innerText.length >= arguments[1];
+}
+return state;
+"""
+
+RELEASE_TAB_SCRIPT = """
+try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}
+window.location.href = 'about:blank';
+"""
+
+TAB_FAILURE_STATUSES = {
+    False: {"timeout": "failed_timeout_initial", "webdriver": "failed_webdriver_error_initial",
+            "exception": "failed_general_exception"},
+    True: {"timeout": "failed_timeout_followed_link", "webdriver": "failed_webdriver_followed_link",
+           "exception": "failed_exception_followed_link"},
+}
+
+class _TabJob:
+    def __init__(self, job_id, url: str, debug_log: ScrapeLog, handle: str, budget: ScrapeBudget):
+        self.job_id = job_id
+        self.url = url
+        self.debug_log = debug_log
+        self.handle = handle
+        self.budget = budget
+        self.initial_url = ""
+        self.followed_url = None
+        self.crawl: Optional[AboutCrawl] = None
+        self.final_url_attempted = url
+
+class TabbedScraper:
+    # Runs up to `tabs` scrapes at once inside one browser, following the same steps
+    # as scrape_with_driver. Navigation is started from page script so no WebDriver
+    # call waits on a load; poll() visits each busy tab and advances it when ready.
+    # The original window is never used for jobs, so closing a stuck tab can not end the session.
+    def __init__(self, driver, tabs: int, profile: str = SCRAPE_PROFILE):
+        self.driver = driver
+        self.profile = profile
+        self._free: List[str] = [self._open_tab() for _ in range(tabs)]
+        self._active: Dict[str, _TabJob] = {}
+        self._finished: List[Tuple[Any, Dict[str, Any]]] = []
+        self._released_since_clear = 0
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    def has_free_tab(self) -> bool:
+        return bool(self._free)
+
+    def _open_tab(self) -> str:
+        self.driver.switch_to.new_window('tab')
+        apply_profile(self.driver, self.profile)
+        return self.driver.current_window_handle
+
+    def _navigate(self, job: _TabJob, url: str, stage: str):
+        job.budget.begin(stage)
+        self.driver.execute_script(NAVIGATE_SCRIPT, url)
+
+    def _result(self, job: _TabJob, status: str, scraped_content: str = "", error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'scraped_content': scraped_content,
+            'status': status,
+            'error': error,
+            'final_url_attempted': job.final_url_attempted,
+            'page_load_stats': None,
+            'stage_timings': job.budget.timings,
+            'spans': job.budget.spans.spans
+        }
+
+    def _failure(self, job: _TabJob, kind: str, event: Event, **fields) -> Dict[str, Any]:
+        job.budget.cancel()
+        job.debug_log.event(event, **fields)
+        error = str(fields['error']).strip().split('\n', 1)[0] if kind == "webdriver" and fields.get('error') else None
+        return self._result(job, TAB_FAILURE_STATUSES[job.followed_url is not None][kind], error=error)
+
+    def start(self, job_id, url: str, debug_log: ScrapeLog, stage_timeouts: Optional[Dict[str, float]] = None):
+        handle = self._free.pop()
+        job = _TabJob(job_id, url, debug_log, handle, ScrapeBudget(stage_timeouts, timeout_errors=(TimeoutException,)))
+        with job.budget.spans.span("normalize_url"):
+            job.initial_url = normalize_url(url, debug_log)
+        if not job.initial_url:
+            self._free.append(handle)
+            self._finished.append((job_id, self._result(job, "failed_invalid_initial_url")))
+            return
+
+        self._active[handle] = job
+        debug_log.event(Event.NAVIGATING, url=job.initial_url, tab=len(self._active),
+                        tabs=len(self._active) + len(self._free))
+        try:
+            self.driver.switch_to.window(handle)
+            self._navigate(job, job.initial_url, "initial_load")
+        except WebDriverException as e:
+            del self._active[handle]
+            self._finished.append((job_id, self._failure(job, "webdriver", Event.LOAD_ERROR, url=url, error=e)))
+            self._release(handle, True)
+
+    def poll(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        finished, self._finished = self._finished, []
+        for handle, job in list(self._active.items()):
+            discard = False
             try:
-                debug_log.append("Stopping service.")
-                service.stop()
-                debug_log.append("Service stopped successfully.")
+                self.driver.switch_to.window(handle)
+                result = self._advance(job)
+            except TimeoutException:
+                discard = True
+                result = self._failure(job, "timeout", Event.LOAD_TIMEOUT, url=job.url, stage="tab_unresponsive")
+            except WebDriverException as e:
+                discard = True
+                result = self._failure(job, "webdriver", Event.LOAD_ERROR, url=job.url, error=e)
             except Exception as e:
-                debug_log.append(f"Error stopping service: {e}")
+                result = self._failure(job, "exception", Event.SCRAPE_EXCEPTION, url=job.url, error=e)
+            if result is None:
+                continue
+
+            del self._active[handle]
+            self._release(handle, discard or result['status'].startswith("failed_timeout"))
+            finished.append((job.job_id, result))
+
+        if self._released_since_clear and (not self._active or self._released_since_clear >= TAB_COOKIE_CLEAR_JOBS):
+            # Cookies are shared by every tab. Clearing them mid-job may cost a busy tab its
+            # session, so that only happens once enough finished jobs have built up.
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self._released_since_clear = 0
+        return finished
+
+    def _advance(self, job: _TabJob) -> Optional[Dict[str, Any]]:
+        target = job.followed_url or job.initial_url
+        state = self.driver.execute_script(TAB_STATE_SCRIPT, self.profile == "lean", MIN_CONTENT_LENGTH)
+        if not state['ready']:
+            if not job.budget.expired():
+                return None
+            job.budget.end()
+            if self.profile != "lean" or not state['started'] or state['readyState'] == "loading":
+                if job.crawl is None:
+                    return self._failure(job, "timeout", Event.LOAD_TIMEOUT, url=target, stage="initial_load")
+                job.debug_log.event(Event.LOAD_TIMEOUT, url=target, stage="follow_load")
+                job.crawl.fail("failed_timeout_followed_link")
+                return self._next_candidate(job)
+            job.debug_log.event(Event.PAGE_NOT_COMPLETE)
+        elif state['url'].startswith("chrome-error://"):
+            job.budget.cancel()
+            if job.crawl is None:
+                return self._failure(job, "webdriver", Event.LOAD_ERROR, url=target, error=state.get('error') or "chrome-error page")
+            job.debug_log.event(Event.LOAD_ERROR, url=target, error=state.get('error') or "chrome-error page")
+            job.crawl.fail("failed_webdriver_followed_link")
+            return self._next_candidate(job)
         else:
-            debug_log.append("Driver or service was not initialized, no need to quit/stop.")
+            job.budget.end()
+
+        job.debug_log.event(Event.PAGE_LOADED, url=state['url'])
+        with job.budget.stage("extract"):
+            content = extract_content(self.driver, job.debug_log)
+
+        if job.crawl is not None:
+            job.crawl.offer(state['url'], content)
+            return self._next_candidate(job)
+
+        job.final_url_attempted = state['url']
+        if len(content) >= MIN_CONTENT_LENGTH:
+            job.debug_log.event(Event.CONTENT_ENOUGH, chars=len(content))
+            return self._result(job, "success_content_found", content)
+
+        job.debug_log.event(Event.CONTENT_TOO_SHORT, chars=len(content), next="links")
+        with job.budget.stage("link_discovery"):
+            candidates = find_about_candidates(self.driver, job.initial_url, job.final_url_attempted, job.debug_log)
+        if not candidates:
+            return self._result(job, "failed_no_about_link_found")
+
+        job.crawl = AboutCrawl(candidates, job.debug_log)
+        return self._next_candidate(job)
+
+    def _next_candidate(self, job: _TabJob) -> Optional[Dict[str, Any]]:
+        # Same serial walk as follow_about_candidates, one navigation per poll.
+        about_url = job.crawl.next_candidate() if not job.budget.exhausted() else None
+        if about_url is None and job.budget.exhausted():
+            job.debug_log.event(Event.BUDGET_EXHAUSTED, position=job.crawl.position + 1, total=job.crawl.total)
+        if about_url is not None:
+            job.debug_log.event(Event.CANDIDATE_FETCH, kind="browser", position=job.crawl.position,
+                                total=job.crawl.total, url=about_url)
+            job.followed_url = about_url
+            self._navigate(job, about_url, "follow_load")
+            return None
+
+        status, best_url, content = job.crawl.outcome("failed_content_too_short_followed")
+        job.final_url_attempted = best_url or job.final_url_attempted
+        if status == "success_followed_link":
+            job.debug_log.event(Event.FOLLOWED_SUCCESS, chars=len(content))
+        elif status == "failed_content_too_short_followed":
+            job.debug_log.event(Event.FOLLOWED_TOO_SHORT, chars=len(content))
+        return self._result(job, status, content)
+
+    def _release(self, handle: str, discard: bool):
+        self._released_since_clear += 1
+        if not discard:
+            try:
+                self.driver.execute_script(RELEASE_TAB_SCRIPT)
+                self._free.append(handle)
+                return
+            except WebDriverException:
+                pass
+        # A hung or timed-out tab is closed and replaced; the rest of the browser keeps going.
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except WebDriverException:
+            pass
+        self._free.append(self._open_tab())
 
-    return_dict['scraped_content'] = scraped_content
-    return_dict['status'] = status
-    return_dict['final_url_attempted'] = final_url_attempted
-    return_dict['debug_log'] = debug_log
-    return_dict['business_id'] = business_id # Ensure business_id is always returned
+def _scrape_process(business_id: str, url: str, conn, text_segment: str):
+    driver = None
+    service = None
+    result = {'scraped_content': "", 'status': "failed_unknown", 'final_url_attempted': url}
+    debug_log = ScrapeLog()
+    spans = SpanRecorder()
 
-def scrape_about_page_selenium(business_id: str, url: str) -> Dict[str, Any]:
-    manager = multiprocessing.Manager()
-    return_dict = manager.dict()
-    debug_log = [f"Attempting to scrape {url} with process timeout {PROCESS_TIMEOUT_SECONDS}s"]
+    try:
+        debug_log.event(Event.DRIVER_SETUP)
+        with spans.span("driver_startup"):
+            driver, service = create_driver(business_id)
+        result = scrape_with_driver(driver, url, debug_log)
+        spans.spans.extend(result['spans'])
+    except WebDriverException as e:
+        result['status'] = "failed_webdriver_error_initial"
+        debug_log.event(Event.DRIVER_START_FAILED, error=e)
+    except Exception as e:
+        result['status'] = "failed_general_exception"
+        debug_log.event(Event.SCRAPE_EXCEPTION, url=url, error=e)
+    finally:
+        with spans.span("driver_quit"):
+            quit_driver(driver, service, debug_log)
+
+    # Large text goes through the shared memory segment named by the parent; the pipe
+    # only carries its length.
+    text_size = put_text(text_segment, result['scraped_content']) if result['scraped_content'] else None
+    conn.send({
+        'scraped_content': result['scraped_content'] if text_size is None else None,
+        'text_size': text_size,
+        'status': result['status'],
+        'error': result.get('error'),
+        'final_url_attempted': result['final_url_attempted'],
+        'debug_log': debug_log.records,
+        'spans': spans.spans
+    })
+    conn.close()
 
-    process = multiprocessing.Process(target=_scrape_process, args=(business_id, url, return_dict))
+def scrape_about_page_selenium(business_id: str, url: str) -> Dict[str, Any]:
+    # The scrape stops itself when its budget runs out; the grace only covers driver
+    # startup and shutdown, so a hung process is killed soon after.
+    process_timeout = budget_seconds(default_stage_timeouts()) + WORKER_KILL_GRACE_SECONDS
+    debug_log = ScrapeLog()
+    debug_log.event(Event.SCRAPE_STARTED, id=business_id, url=url, tier="browser", timeout=round(process_timeout))
+
+    text_segment = new_segment_name()
+    recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_scrape_process, args=(business_id, url, send_conn, text_segment))
     process.start()
-    process.join(timeout=PROCESS_TIMEOUT_SECONDS)
+    send_conn.close()
 
+    # Read before joining: a child blocked writing a large reply to the pipe would never exit.
+    reply = None
+    timed_out = not recv_conn.poll(process_timeout)
+    if not timed_out:
+        try:
+            reply = recv_conn.recv()
+        except EOFError:
+            pass
+    recv_conn.close()
+    if not timed_out:
+        # The reply is sent after the driver quits, so the child is about to exit.
+        process.join(timeout=WORKER_KILL_GRACE_SECONDS)
     if process.is_alive():
         process.terminate()
         process.join()
-        status = "failed_process_timeout"
-        debug_log.append(f"Process timed out after {PROCESS_TIMEOUT_SECONDS} seconds and was terminated.")
-        scraped_content = ""
-        final_url_attempted = url
+
+    scraped_content = ""
+    error = None
+    final_url_attempted = url
+    spans = []
+    if reply is not None:
+        scraped_content = reply['scraped_content'] if reply['text_size'] is None \
+            else take_text(text_segment, reply['text_size'])
+        status = reply['status']
+        error = reply['error']
+        final_url_attempted = reply['final_url_attempted']
+        debug_log.extend(reply['debug_log'])
+        spans = reply['spans']
     else:
-        scraped_content = return_dict.get('scraped_content', "")
-        status = return_dict.get('status', "failed_no_result_from_process")
-        final_url_attempted = return_dict.get('final_url_attempted', url)
-        debug_log.extend(return_dict.get('debug_log', []))
-        
-    debug_log.append(f"Scraping attempt for {url} finished with status: {status}")
+        # A killed child may have created the segment without reporting it.
+        discard_text(text_segment)
+        status = "failed_process_timeout" if timed_out else "failed_no_result_from_process"
+        if timed_out:
+            debug_log.event(Event.PROCESS_TIMEOUT, seconds=round(process_timeout))
+
+    debug_log.event(Event.SCRAPE_FINISHED, status=status)
 
     return {
         "scraped_content": scraped_content,
         "status": status,
+        "error": error,
         "final_url_attempted": final_url_attempted,
-        "debug_log": debug_log,
-        "business_id": business_id
+        "debug_log": debug_log.records,
+        "business_id": business_id,
+        "spans": spans
     }
 
 if __name__ == "__main__":
@@ -326,13 +725,8 @@ if __name__ == "__main__":
     for i, url in enumerate(test_urls):
         biz_id = test_business_ids[i]
         print(f"\n===== Running Scrape Test for {url} (ID: {biz_id}) =====")
-        
-        original_process_timeout = PROCESS_TIMEOUT_SECONDS
-        PROCESS_TIMEOUT_SECONDS = 30
-        
+
         result = scrape_about_page_selenium(biz_id, url)
-        
-        PROCESS_TIMEOUT_SECONDS = original_process_timeout
 
         print(f"\n--- Scrape Result Summary for {url} (ID: {biz_id}) ---")
         print(f"Status: {result['status']}")
@@ -346,5 +740,5 @@ if __name__ == "__main__":
 
         print("\n--- Full Debug Log ---")
         for log_entry in result["debug_log"]:
-            print(f"    {log_entry}")
+            print(f"    {describe(log_entry)}")
         print("--------------------------\n")
@@ -0,0 +1,50 @@
+import os
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+from config import SHARED_TEXT_MIN_BYTES
+
+# Large text is passed from a scrape process to its parent in a shared memory
+# segment. The parent picks the segment name up front, so it can remove the
+# segment even when the child is killed before reporting it.
+
+
+def new_segment_name() -> str:
+    # Called in the parent before the child starts. With the tracker already running a
+    # forked child registers its segment there, instead of starting a tracker of its own
+    # that would remove the segment as soon as the child exits.
+    resource_tracker.ensure_running()
+    return f"scrape_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+
+
+def put_text(name: str, text: str, min_bytes: int = SHARED_TEXT_MIN_BYTES) -> Optional[int]:
+    # Returns the byte length written, or None if the text is small enough to send inline.
+    data = text.encode('utf-8')
+    if len(data) < min_bytes:
+        return None
+    segment = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    try:
+        segment.buf[:len(data)] = data
+    finally:
+        segment.close()
+    return len(data)
+
+
+def take_text(name: str, size: int) -> str:
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        # Decoded straight from the mapped buffer, without an intermediate bytes copy.
+        return str(segment.buf[:size], 'utf-8')
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def discard_text(name: str):
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
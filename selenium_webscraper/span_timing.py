@@ -0,0 +1,84 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from config import SPAN_LOG_PATH
+
+# A span is [name, seconds]. Nested spans are named "<stage>/<step>" and are
+# recorded before the stage that contains them.
+
+
+class SpanRecorder:
+    def __init__(self):
+        self.spans: List[list] = []
+
+    def add(self, name: str, seconds: float):
+        self.spans.append([name, round(seconds, 4)])
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class SpanStats:
+    def __init__(self):
+        self._by_stage: Dict[str, List[float]] = defaultdict(list)
+        self._by_status: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    def record(self, status: Optional[str], spans: Optional[List[list]]):
+        if not spans:
+            return
+        per_status = self._by_status[status or "unknown"]
+        for name, seconds in spans:
+            self._by_stage[name].append(seconds)
+            per_status[name].append(seconds)
+
+    @staticmethod
+    def _quantiles(samples: List[float]) -> str:
+        ordered = sorted(samples)
+        return (f"p50 {percentile(ordered, 0.5):.2f}s / p95 {percentile(ordered, 0.95):.2f}s / "
+                f"p99 {percentile(ordered, 0.99):.2f}s (n={len(ordered)})")
+
+    def summary(self) -> str:
+        if not self._by_stage:
+            return "Stage spans: none recorded."
+        lines = ["Stage spans:"]
+        for name in sorted(self._by_stage):
+            lines.append(f"  {name:<28} {self._quantiles(self._by_stage[name])}")
+        lines.append("Stage spans by status:")
+        for status in sorted(self._by_status):
+            per_status = self._by_status[status]
+            lines.append(f"  {status}:")
+            for name in sorted(per_status):
+                lines.append(f"    {name:<26} {self._quantiles(per_status[name])}")
+        return "\n".join(lines)
+
+
+class SpanLog:
+    # One JSON line per scraped business, next to the results file.
+    def __init__(self, path: Path = SPAN_LOG_PATH):
+        self.path = Path(path)
+        self._file = None
+
+    def open(self, resume: bool):
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def append(self, record: Dict):
+        self._file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
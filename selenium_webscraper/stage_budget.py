@@ -0,0 +1,121 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple, Type
+
+from span_timing import SpanRecorder
+from config import (
+    SCRAPE_BUDGET_SECONDS, STAGE_TIMEOUT_BOUNDS, STAGE_TIMEOUT_P95_MULTIPLIER,
+    STAGE_LATENCY_WINDOW, STAGE_LATENCY_MIN_SAMPLES
+)
+
+STAGES = list(STAGE_TIMEOUT_BOUNDS)
+
+
+def default_stage_timeouts() -> Dict[str, float]:
+    return {stage: float(upper) for stage, (_, upper) in STAGE_TIMEOUT_BOUNDS.items()}
+
+
+def budget_seconds(stage_timeouts: Dict[str, float]) -> float:
+    return min(SCRAPE_BUDGET_SECONDS, sum(stage_timeouts.values()))
+
+
+class ScrapeBudget:
+    def __init__(self, stage_timeouts: Optional[Dict[str, float]] = None,
+                 timeout_errors: Tuple[Type[BaseException], ...] = ()):
+        self.stage_timeouts = dict(stage_timeouts or default_stage_timeouts())
+        self.total = budget_seconds(self.stage_timeouts)
+        self.deadline = time.monotonic() + self.total
+        self.timeout_errors = timeout_errors
+        self.timings: Dict[str, float] = {}
+        self.spans = SpanRecorder()
+        self._stage = None
+        self._stage_start = 0.0
+        self._stage_deadline = self.deadline
+
+    def begin(self, stage: str):
+        now = time.monotonic()
+        self._stage = stage
+        self._stage_start = now
+        self._stage_deadline = min(self.deadline, now + self.stage_timeouts[stage])
+
+    def end(self):
+        if self._stage is not None:
+            elapsed = time.monotonic() - self._stage_start
+            self.timings[self._stage] = self.timings.get(self._stage, 0.0) + elapsed
+            self.spans.add(self._stage, elapsed)
+            self._stage = None
+
+    def cancel(self):
+        # Cancelled stages still show up as spans, only the adaptive timeouts ignore them.
+        if self._stage is not None:
+            self.spans.add(self._stage, time.monotonic() - self._stage_start)
+            self._stage = None
+
+    def remaining(self) -> float:
+        return max(0.0, self._stage_deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._stage_deadline
+
+    @contextmanager
+    def stage(self, stage: str):
+        # Timings are kept for stages that finished or ran out of time; fast failures
+        # such as DNS errors say nothing about how long a healthy stage takes.
+        self.begin(stage)
+        try:
+            yield self
+        except self.timeout_errors:
+            self.end()
+            raise
+        except BaseException:
+            self.cancel()
+            raise
+        self.end()
+
+
+class StageLatencyTracker:
+    def __init__(self, window: int = STAGE_LATENCY_WINDOW, min_samples: int = STAGE_LATENCY_MIN_SAMPLES,
+                 multiplier: float = STAGE_TIMEOUT_P95_MULTIPLIER):
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self._samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self._timeouts = default_stage_timeouts()
+
+    def record(self, timings: Optional[Dict[str, float]]):
+        if not timings:
+            return
+        for stage, seconds in timings.items():
+            if stage in self._samples:
+                self._samples[stage].append(seconds)
+                self._timeouts[stage] = self._timeout_for(stage)
+
+    def p95(self, stage: str) -> Optional[float]:
+        samples = self._samples[stage]
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def _timeout_for(self, stage: str) -> float:
+        lower, upper = STAGE_TIMEOUT_BOUNDS[stage]
+        p95 = self.p95(stage)
+        if p95 is None:
+            return float(upper)
+        # Timed-out stages are recorded at their full duration, so a rising timeout rate
+        # pushes p95 (and the timeout) back up toward the upper bound.
+        return min(float(upper), max(float(lower), p95 * self.multiplier))
+
+    def stage_timeouts(self) -> Dict[str, float]:
+        return dict(self._timeouts)
+
+    def summary(self) -> str:
+        parts = []
+        for stage in STAGES:
+            p95 = self.p95(stage)
+            observed = f"p95 {p95:.1f}s" if p95 is not None else f"{len(self._samples[stage])} samples"
+            parts.append(f"{stage} {self._timeouts[stage]:.1f}s ({observed})")
+        return "Stage timeouts: " + ", ".join(parts)
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from columnar_store import convert_to_arrow, iter_records_arrow, iter_businesses_arrow
+from load_data import BUSINESS_FIELDS, iter_records, iter_businesses
+
+
+def _record(i, **values):
+    record = {name: None for name in BUSINESS_FIELDS}
+    record.update(_id=str(i), seq_num=str(i), duns_num=f"00{i}", company_name=f"Company {i}")
+    record.update(values)
+    return record
+
+
+def test_json_arrow_round_trip(tmp_path):
+    records = [
+        _record(0, latitude=40.5, longtitude=-73.25, raw_token_count=120, total_emps="12",
+                combined_text="About us " * 50, web_url="https://example.com",
+                selenium_debug_info=[[1, {"tier": "http"}], [24, {"chars": 450}]]),
+        _record(1, latitude=None, raw_token_count=0, total_emps=12, combined_text="",
+                selenium_status="success_content_found", selenium_scraped_content_length=0),
+        _record(2, latitude=41.0, year_started="n/a", selenium_debug_info=["Skipped: no web_url"]),
+    ]
+    src = tmp_path / "businesses.json"
+    src.write_text(json.dumps(records), encoding="utf-8")
+    dst = tmp_path / "businesses.arrow"
+
+    assert convert_to_arrow(src, dst, batch_size=2) == len(records)
+    assert list(iter_records_arrow(dst)) == list(iter_records(src))
+    assert list(iter_businesses_arrow(dst)) == list(iter_businesses(src))
+
+
+def test_selected_fields(tmp_path):
+    src = tmp_path / "businesses.json"
+    src.write_text(json.dumps([_record(0, latitude=40.5, selenium_debug_info=[[46]])]), encoding="utf-8")
+    dst = tmp_path / "businesses.arrow"
+    convert_to_arrow(src, dst)
+
+    assert list(iter_records_arrow(dst, ["latitude", "selenium_debug_info"])) == \
+        [{"latitude": 40.5, "selenium_debug_info": [[46]]}]
@@ -0,0 +1,33 @@
+from path_probe import PathHitStats, PROBE_PATHS
+
+
+def test_untried_paths_are_rotated_in():
+    stats = PathHitStats()
+    probed = set()
+    for _ in range(len(PROBE_PATHS)):
+        for path in stats.ordered():
+            probed.add(path)
+            stats.record(path, False)
+    assert probed == set(PROBE_PATHS)
+
+
+def test_hit_on_late_path_is_learned():
+    stats = PathHitStats()
+    late_path = "/company"
+    assert PROBE_PATHS.index(late_path) >= 8
+    assert late_path not in stats.ordered()
+
+    for _ in range(len(PROBE_PATHS)):
+        for path in stats.ordered():
+            stats.record(path, path == late_path)
+
+    assert stats.ordered()[0] == late_path
+
+
+def test_proven_paths_leave_explore_slots():
+    stats = PathHitStats()
+    for path in PROBE_PATHS:
+        stats.record(path, True)
+    ordered = stats.ordered(limit=8, explore=2)
+    assert ordered[:6] == PROBE_PATHS[:6]
+    assert len(ordered) == 8
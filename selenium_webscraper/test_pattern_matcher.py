@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+from config import PHRASES, KEYWORDS, IRRELEVANT_KEYWORDS, ABOUT_URL_KEYWORDS
+from pattern_matcher import MultiPatternMatcher
+
+CATEGORIES = {
+    "phrase": (PHRASES, False),
+    "keyword": (KEYWORDS, False),
+    "irrelevant": (IRRELEVANT_KEYWORDS, True),
+    "about_url": (ABOUT_URL_KEYWORDS, True),
+}
+
+EDGE_CASES = [
+    "",
+    "team",
+    "teams and teamwork",
+    "our team_members",
+    "_team_",
+    "meet-the-team",
+    "about-us about_us aboutus",
+    "https://example.com/about-us/our-story",
+    "https://example.com/teams/leadership2",
+    "newsroom news-letter news",
+    "careers_page jobs123 job",
+    "équipe team équipe",
+    "teamé éteam",
+    "über about ünsere mission",
+    "missioné missioń missión",
+    "our story our story our story",
+    "who we arewho we are",
+    "contact:support/press.media",
+    "blog\nblog\tblog",
+]
+
+
+def per_term_search(text, terms, whole_word):
+    # The checks MultiPatternMatcher replaced: one regex per term.
+    patterns = [re.compile((r'\b' if whole_word else '') + re.escape(term) + (r'\b' if whole_word else ''))
+                for term in {t.lower() for t in terms if t}]
+    return any(pattern.search(text) for pattern in patterns)
+
+
+def per_term_count(text, terms, whole_word):
+    # Overlapping hits of every term, as count() reports them.
+    total = 0
+    for term in {t.lower() for t in terms if t}:
+        pattern = re.compile((r'\b' if whole_word else '') + '(?=' + re.escape(term) + (r'\b' if whole_word else '') + ')')
+        total += len(pattern.findall(text))
+    return total
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_counts_match_per_term_regexes(text):
+    counts = MultiPatternMatcher(CATEGORIES).count(text)
+    for category, (terms, whole_word) in CATEGORIES.items():
+        assert counts[category] == per_term_count(text, terms, whole_word), category
+        assert (counts[category] > 0) == per_term_search(text, terms, whole_word), category
+
+
+def test_overlapping_terms_are_all_counted():
+    matcher = MultiPatternMatcher({"words": (["team", "teamwork", "work"], True), "parts": (["team", "eam"], False)})
+    assert matcher.count("teamwork team") == {"words": 2, "parts": 4}
+    assert matcher.count("teams team_ team-") == {"words": 1, "parts": 6}
@@ -0,0 +1,455 @@
+import itertools
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Optional, Dict, Any, List
+
+from selenium.common.exceptions import WebDriverException
+
+from config import (
+    SCRAPER_POOL_SIZE, MAX_JOBS_PER_WORKER, MAX_WORKER_RSS_MB, WORKER_KILL_GRACE_SECONDS, SCRAPE_PROFILE,
+    TABS_PER_WORKER, TAB_POLL_INTERVAL_SECONDS, WORKER_STARTUP_TIMEOUT_SECONDS, PAGE_LOAD_STATS
+)
+from scrape_events import Event, ScrapeLog, event_record, get_capture_level, set_capture_level
+from selenium_scraper import (
+    create_driver, reset_driver, quit_driver, scrape_with_driver, TabbedScraper, set_page_load_stats_enabled
+)
+from span_timing import SpanRecorder
+from stage_budget import StageLatencyTracker, budget_seconds
+
+try:
+    import psutil
+except ImportError:
+    print("psutil not found, worker memory ceiling (MAX_WORKER_RSS_MB) disabled. Please install it: pip install psutil",
+          file=sys.stderr)
+    psutil = None
+
+# Sent by a worker once its browser is up; the parent only assigns jobs after it.
+WORKER_READY = "ready"
+
+
+def _driver_rss_mb(service) -> Optional[float]:
+    if psutil is None or service is None or service.process is None:
+        return None
+    try:
+        root = psutil.Process(service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+def _signal_process_group(process, sig) -> bool:
+    # Workers lead their own process group (see _worker_main), which chromedriver and
+    # Chrome inherit, so one signal reaches the whole tree even after the worker died.
+    if not hasattr(os, 'killpg'):
+        return False
+    try:
+        os.killpg(process.pid, sig)
+    except OSError:
+        return False
+    return True
+
+
+def _terminate_process_tree(process, grace: float):
+    # The worker's chromedriver and Chrome children would outlive a plain terminate().
+    children = []
+    if psutil is not None:
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.Error:
+            pass
+    if process.is_alive():
+        if not _signal_process_group(process, signal.SIGTERM):
+            process.terminate()
+        process.join(timeout=grace)
+    if process.is_alive():
+        process.kill()
+    process.join()
+    _signal_process_group(process, getattr(signal, 'SIGKILL', signal.SIGTERM))
+    for child in children:
+        try:
+            child.kill()
+        except psutil.Error:
+            pass
+
+
+def _failed_result(business_id: str, url: str, status: str, reason: str, **fields) -> Dict[str, Any]:
+    return {
+        "scraped_content": "",
+        "status": status,
+        "final_url_attempted": url,
+        "debug_log": [event_record(Event.WORKER_FAILED, reason=reason, **fields),
+                      event_record(Event.SCRAPE_FINISHED, status=status)],
+        "business_id": business_id
+    }
+
+
+def _check_recycle(worker_id: int, jobs_done: int, max_jobs: int, max_rss_mb: float, service, debug_log: ScrapeLog) -> bool:
+    rss_mb = _driver_rss_mb(service)
+    if jobs_done >= max_jobs:
+        debug_log.event(Event.WORKER_RECYCLE, worker=worker_id, jobs=jobs_done)
+        return True
+    if rss_mb is not None and rss_mb >= max_rss_mb:
+        debug_log.event(Event.WORKER_RECYCLE, worker=worker_id, rss_mb=round(rss_mb), max_rss_mb=max_rss_mb)
+        return True
+    return False
+
+
+def _send_result(conn, job_id, business_id: str, url: str, result: Dict[str, Any], debug_log: ScrapeLog, recycle: bool):
+    debug_log.event(Event.SCRAPE_FINISHED, status=result['status'])
+    result['debug_log'] = debug_log.records
+    result['business_id'] = business_id
+    conn.send((job_id, result, recycle))
+
+
+def _warm_start(conn, worker_id: int, profile: str, tabs: int):
+    # The browser starts before the worker reports ready, so a cold start never counts
+    # against a job's deadline. If it fails, the first job tries again and reports why.
+    driver = service = scraper = None
+    spans = SpanRecorder()
+    try:
+        with spans.span("driver_startup"):
+            driver, service = create_driver(f"worker_{worker_id}", profile, tabbed=tabs > 1)
+            if tabs > 1:
+                scraper = TabbedScraper(driver, tabs, profile)
+    except Exception:
+        quit_driver(driver, service, ScrapeLog())
+        driver = service = scraper = None
+        spans = SpanRecorder()
+    conn.send(WORKER_READY)
+    return driver, service, scraper, spans.spans
+
+
+def _worker_main(worker_id: int, conn, max_jobs: int, max_rss_mb: float, profile: str, tabs: int = 1,
+                 capture_level: Optional[int] = None, page_load_stats: bool = PAGE_LOAD_STATS):
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    if capture_level is not None:
+        set_capture_level(capture_level)
+    set_page_load_stats_enabled(page_load_stats)
+    if tabs > 1:
+        _tabbed_worker_main(worker_id, conn, max_jobs, max_rss_mb, profile, tabs)
+        return
+
+    driver, service, _, startup_spans = _warm_start(conn, worker_id, profile, tabs)
+    jobs_done = 0
+    recycle = False
+
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+
+            job_id, business_id, url, stage_timeouts = job
+            debug_log = ScrapeLog()
+            debug_log.event(Event.SCRAPE_STARTED, id=business_id, url=url, tier="browser", worker=worker_id,
+                            job=jobs_done + 1)
+            result = {'scraped_content': "", 'status': "failed_unknown", 'final_url_attempted': url}
+            spans = SpanRecorder()
+            try:
+                if driver is None:
+                    debug_log.event(Event.DRIVER_SETUP)
+                    with spans.span("driver_startup"):
+                        driver, service = create_driver(f"worker_{worker_id}", profile)
+                result = scrape_with_driver(driver, url, debug_log, profile, stage_timeouts)
+            except WebDriverException as e:
+                result['status'] = "failed_webdriver_error_initial"
+                debug_log.event(Event.DRIVER_START_FAILED, error=e)
+            except Exception as e:
+                result['status'] = "failed_general_exception"
+                debug_log.event(Event.SCRAPE_EXCEPTION, url=url, error=e)
+            result['spans'] = startup_spans + spans.spans + result.get('spans', [])
+            startup_spans = []
+            jobs_done += 1
+
+            # Decide on recycling before replying so the parent stops queueing jobs here;
+            # the parent sends None once the worker has nothing in flight.
+            recycle = recycle or _check_recycle(worker_id, jobs_done, max_jobs, max_rss_mb, service, debug_log)
+            if driver is not None and not recycle:
+                # Reset before replying so it runs within this job's deadline, not the next one's.
+                try:
+                    reset_driver(driver, debug_log)
+                except Exception as e:
+                    # A driver that cannot be reset is most likely dead; a replacement worker starts warm.
+                    debug_log.event(Event.WORKER_RECYCLE, worker=worker_id, reason="reset_failed", error=e)
+                    recycle = True
+            _send_result(conn, job_id, business_id, url, result, debug_log, recycle)
+    finally:
+        quit_driver(driver, service, ScrapeLog())
+        conn.close()
+
+
+def _tabbed_worker_main(worker_id: int, conn, max_jobs: int, max_rss_mb: float, profile: str, tabs: int):
+    driver, service, scraper, startup_spans = _warm_start(conn, worker_id, profile, tabs)
+    jobs = {}
+    jobs_done = 0
+    recycle = False
+    stopping = False
+
+    def finish(job_id, result):
+        nonlocal jobs_done, recycle, startup_spans
+        business_id, url, debug_log, spans = jobs.pop(job_id)
+        result['spans'] = startup_spans + spans.spans + result.get('spans', [])
+        startup_spans = []
+        jobs_done += 1
+        recycle = recycle or _check_recycle(worker_id, jobs_done, max_jobs, max_rss_mb, service, debug_log)
+        _send_result(conn, job_id, business_id, url, result, debug_log, recycle)
+
+    try:
+        while not stopping or jobs:
+            # Block on the pipe only when no tab needs polling.
+            while not stopping and (scraper is None or scraper.has_free_tab()):
+                try:
+                    if not conn.poll(0 if jobs else None):
+                        break
+                    job = conn.recv()
+                except EOFError:
+                    job = None
+                if job is None:
+                    stopping = True
+                    break
+
+                job_id, business_id, url, stage_timeouts = job
+                debug_log = ScrapeLog()
+                debug_log.event(Event.SCRAPE_STARTED, id=business_id, url=url, tier="browser", worker=worker_id,
+                                job=jobs_done + len(jobs) + 1)
+                spans = SpanRecorder()
+                jobs[job_id] = (business_id, url, debug_log, spans)
+                try:
+                    if scraper is None:
+                        debug_log.event(Event.DRIVER_SETUP, tabs=tabs)
+                        with spans.span("driver_startup"):
+                            driver, service = create_driver(f"worker_{worker_id}", profile, tabbed=True)
+                            scraper = TabbedScraper(driver, tabs, profile)
+                    scraper.start(job_id, url, debug_log, stage_timeouts)
+                except Exception as e:
+                    status = "failed_webdriver_error_initial" if isinstance(e, WebDriverException) else "failed_general_exception"
+                    debug_log.event(Event.DRIVER_START_FAILED if isinstance(e, WebDriverException) else Event.SCRAPE_EXCEPTION,
+                                    url=url, error=e)
+                    finish(job_id, {'scraped_content': "", 'status': status, 'final_url_attempted': url})
+
+            if not jobs:
+                continue
+            try:
+                finished = scraper.poll()
+            except Exception as e:
+                # The browser itself is gone: fail what it was running and retire the worker,
+                # so its replacement starts a fresh browser before taking jobs.
+                recycle = True
+                finished = [(job_id, {'scraped_content': "", 'status': "failed_webdriver_error_initial",
+                                      'final_url_attempted': url})
+                            for job_id, (_, url, _, _) in jobs.items()]
+                for _, _, debug_log, _ in jobs.values():
+                    debug_log.event(Event.BROWSER_LOST, error=e)
+                quit_driver(driver, service, ScrapeLog())
+                driver, service, scraper = None, None, None
+            for job_id, result in finished:
+                finish(job_id, result)
+            if not finished:
+                time.sleep(TAB_POLL_INTERVAL_SECONDS)
+    finally:
+        quit_driver(driver, service, ScrapeLog())
+        conn.close()
+
+
+class _Worker:
+    def __init__(self, worker_id: int, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.jobs = {}
+        self.retiring = False
+        self.stop_sent = False
+        self.ready = False
+        self.spawned_at = time.monotonic()
+
+
+class ScraperPool:
+    def __init__(self, size: int = SCRAPER_POOL_SIZE, max_jobs_per_worker: int = MAX_JOBS_PER_WORKER,
+                 max_rss_mb: float = MAX_WORKER_RSS_MB, kill_grace: float = WORKER_KILL_GRACE_SECONDS,
+                 profile: str = SCRAPE_PROFILE, tabs_per_worker: int = TABS_PER_WORKER,
+                 latency: Optional[StageLatencyTracker] = None, capture_level: Optional[int] = None,
+                 page_load_stats: bool = PAGE_LOAD_STATS):
+        self.size = size
+        self.profile = profile
+        self.tabs_per_worker = max(1, tabs_per_worker)
+        self.page_load_stats = page_load_stats
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.kill_grace = kill_grace
+        self.latency = latency or StageLatencyTracker()
+        # Workers may be spawned rather than forked, so the event level is passed explicitly.
+        self.capture_level = get_capture_level() if capture_level is None else capture_level
+
+        self._workers: List[_Worker] = []
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wakeup_recv, self._wakeup_send = multiprocessing.Pipe(duplex=False)
+        self._job_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        for _ in range(self.size):
+            self._workers.append(self._spawn_worker())
+        self._thread = threading.Thread(target=self._dispatch_loop, name="scraper-pool-dispatch", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup_send.send_bytes(b'')
+        if self._thread:
+            self._thread.join()
+
+    def submit(self, business_id: str, url: str) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ScraperPool is closed")
+            self._pending.append((next(self._job_ids), business_id, url, future))
+            self._wakeup_send.send_bytes(b'')
+        return future
+
+    def scrape(self, business_id: str, url: str) -> Dict[str, Any]:
+        return self.submit(business_id, url).result()
+
+    def _spawn_worker(self) -> _Worker:
+        worker_id = next(self._worker_ids)
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, self.max_jobs_per_worker, self.max_rss_mb, self.profile, self.tabs_per_worker,
+                  self.capture_level, self.page_load_stats),
+            name=f"scraper-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(worker_id, process, parent_conn)
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                idle = not self._pending and not any(w.jobs for w in self._workers)
+                if self._closed and idle:
+                    break
+            self._assign_pending()
+
+            waitables = [self._wakeup_recv]
+            for worker in self._workers:
+                waitables.extend([worker.conn, worker.process.sentinel])
+            ready = wait(waitables, timeout=1.0)
+
+            if self._wakeup_recv in ready:
+                while self._wakeup_recv.poll():
+                    self._wakeup_recv.recv_bytes()
+            for worker in list(self._workers):
+                if worker.conn in ready or worker.process.sentinel in ready:
+                    self._receive(worker)
+            self._check_deadlines()
+
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=30)
+            _terminate_process_tree(worker.process, self.kill_grace)
+            worker.conn.close()
+        self._workers = []
+
+    def _assign_pending(self):
+        with self._lock:
+            for worker in list(self._workers):
+                while worker.ready and not worker.retiring and len(worker.jobs) < self.tabs_per_worker:
+                    while self._pending:
+                        job_id, business_id, url, future = self._pending.popleft()
+                        # Jobs requeued from a terminated worker are already running.
+                        if future.running() or future.set_running_or_notify_cancel():
+                            break
+                    else:
+                        return
+                    # Jobs carry the current adaptive stage timeouts; the hard deadline is their
+                    # total budget plus a short grace for a worker that stopped responding.
+                    stage_timeouts = self.latency.stage_timeouts()
+                    deadline = time.monotonic() + budget_seconds(stage_timeouts) + self.kill_grace
+                    try:
+                        worker.conn.send((job_id, business_id, url, stage_timeouts))
+                    except (BrokenPipeError, OSError):
+                        self._pending.appendleft((job_id, business_id, url, future))
+                        self._replace_worker(worker, "failed_no_result_from_process", "pipe_closed")
+                        break
+                    worker.jobs[job_id] = (future, deadline, business_id, url)
+
+    def _receive(self, worker: _Worker):
+        try:
+            while worker.conn.poll():
+                message = worker.conn.recv()
+                if message == WORKER_READY:
+                    worker.ready = True
+                    continue
+                job_id, result, recycle = message
+                self.latency.record(result.get('stage_timings'))
+                entry = worker.jobs.pop(job_id, None)
+                if entry:
+                    entry[0].set_result(result)
+                if recycle:
+                    worker.retiring = True
+            if worker.retiring and not worker.jobs and not worker.stop_sent:
+                worker.conn.send(None)
+                worker.stop_sent = True
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+
+        if not worker.process.is_alive():
+            with self._lock:
+                self._replace_worker(worker, "failed_no_result_from_process", "worker_exited")
+
+    def _check_deadlines(self):
+        now = time.monotonic()
+        with self._lock:
+            for worker in list(self._workers):
+                if not worker.ready and now - worker.spawned_at > WORKER_STARTUP_TIMEOUT_SECONDS:
+                    self._replace_worker(worker, "failed_no_result_from_process", "startup_timeout")
+                    continue
+                overdue = {job_id for job_id, (_, deadline, _, _) in worker.jobs.items() if deadline < now}
+                if overdue:
+                    # Other jobs sharing the worker's browser were not at fault; run them again elsewhere.
+                    for job_id in [job_id for job_id in worker.jobs if job_id not in overdue]:
+                        future, _, business_id, url = worker.jobs.pop(job_id)
+                        self._pending.appendleft((job_id, business_id, url, future))
+                    self._replace_worker(worker, "failed_process_timeout", "budget_overrun", grace=self.kill_grace)
+
+    def _replace_worker(self, worker: _Worker, status: str, reason: str, **fields):
+        # Caller holds self._lock.
+        if worker not in self._workers:
+            return
+        self._workers.remove(worker)
+        _terminate_process_tree(worker.process, self.kill_grace)
+        worker.conn.close()
+        for future, _, business_id, url in worker.jobs.values():
+            future.set_result(_failed_result(business_id, url, status, reason, worker=worker.worker_id, **fields))
+        worker.jobs.clear()
+        if not self._closed or self._pending:
+            self._workers.append(self._spawn_worker())